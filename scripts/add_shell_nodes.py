@@ -7,10 +7,17 @@ with proper titles, descriptions, and methods extracted from header files.
 """
 
 import json
+import mmap
+import os
 import re
-import uuid
+import secrets
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from canvas_common import read_canvas, write_canvas
 
 # Canvas file path
 CANVAS_PATH = Path.home() / "works" / "notes" / "Programming" / "videoTracker" / "videoTracker UML Diagram.canvas"
@@ -67,31 +74,160 @@ REGULAR_WIDTH = 280
 REGULAR_HEIGHT = 100
 NODE_SPACING_Y = 150  # Vertical spacing between shell nodes
 
+# Worker threads for parsing shell headers concurrently
+HEADER_WORKERS = 4
 
-def extract_public_methods(header_path: Path) -> List[str]:
-    """Extract public methods from a C++ header file"""
-    if not header_path.exists():
-        return []
-    
+# Precompiled per-line dispatch: class start (with '{' on the line), public:, private:/protected:,
+# method declaration. Alternatives are anchored and tried in that order, so a single
+# match per line gives the same priority as separate searches would.
+_RE_DISPATCH = re.compile(
+    r'^(?:'
+    r'(?P<cls>(?=.*\{).*?\bclass\s+\w+)'
+    r'|(?P<pub>.*?\bpublic\s*:)'
+    r'|(?P<priv>.*?\b(?:private|protected)\s*:)'
+    r'|.*?\b(?P<meth>\w+)\s*\([^)]*\)\s*(?:const\s*)?(?:override\s*)?(?:=\s*0\s*)?[;{]'
+    r')'
+)
+_RE_NODE_TITLE = re.compile(r'#\s*(\w+)\.')
+
+# Substrings that mark a method as a key interaction method
+_PRIORITY_KEYWORDS = ('handle', 'execute', 'setup', 'update', 'draw', 'set', 'get')
+
+# Parsed-method cache: str(header path) -> {"mtime", "size", "methods"}
+METHOD_CACHE_PATH = Path.home() / ".cache" / "videoTracker" / "method_cache.json"
+METHOD_CACHE_VERSION = 1  # Bump when header parsing changes
+METHOD_CACHE_MAX_ENTRIES = 1000
+_method_cache: Dict[str, dict] = {}
+_method_cache_lock = threading.Lock()
+
+
+def load_method_cache() -> None:
+    """Load the on-disk method cache into memory"""
+    global _method_cache
+    try:
+        with open(METHOD_CACHE_PATH, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        _method_cache = data["methods"] if data.get("version") == METHOD_CACHE_VERSION else {}
+    except (OSError, ValueError, KeyError, AttributeError):
+        _method_cache = {}
+
+
+def save_method_cache() -> None:
+    """Write the in-memory method cache back to disk"""
     try:
-        content = header_path.read_text(encoding='utf-8')
-    except Exception:
-        return []
+        METHOD_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with open(METHOD_CACHE_PATH, 'w', encoding='utf-8') as f:
+            json.dump({"version": METHOD_CACHE_VERSION, "methods": _method_cache}, f)
+    except OSError:
+        pass
+
+
+def _stat_or_none(path: Path) -> Optional[os.stat_result]:
+    """stat() a path, or None if it does not exist or cannot be read"""
+    try:
+        return os.stat(path)
+    except OSError:
+        return None
+
+
+def extract_public_methods(header_path: Path, st: Optional[os.stat_result] = None) -> List[str]:
+    """Extract public methods from a C++ header file.
     
+    st may carry an existing stat() result for header_path to avoid a second syscall.
+    """
+    if st is None:
+        st = _stat_or_none(header_path)
+        if st is None:
+            return []
+    
+    # Unchanged headers skip the regex pass entirely
+    cache_key = str(header_path)
+    with _method_cache_lock:
+        entry = _method_cache.pop(cache_key, None)
+        if entry and entry.get("mtime") == st.st_mtime and entry.get("size") == st.st_size:
+            _method_cache[cache_key] = entry  # Re-insert as most recently used
+            return list(entry["methods"])
+    
+    if st.st_size == 0:
+        methods = []
+    else:
+        try:
+            with open(header_path, 'rb') as f, \
+                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                methods = _parse_public_methods(_iter_code_lines(mm))
+        except (OSError, ValueError):
+            return []
+    
+    with _method_cache_lock:
+        _method_cache[cache_key] = {"mtime": st.st_mtime, "size": st.st_size, "methods": methods}
+        while len(_method_cache) > METHOD_CACHE_MAX_ENTRIES:
+            _method_cache.pop(next(iter(_method_cache)))
+    
+    return list(methods)
+
+
+def _iter_code_lines(mm: mmap.mmap) -> Iterator[str]:
+    """Yield header lines with // and /* */ comments stripped.
+    
+    Matches stripping the whole decoded file: line endings are normalized as
+    text mode would, // comments are removed first, then each /* ... */ block;
+    text on either side of a multi-line block is joined into one line, and an
+    unterminated /* (with everything after it) is left in place.
+    """
+    pending = None  # (text before an unterminated /*, lines held since it)
+    for raw in iter(mm.readline, b''):
+        text = raw.decode('utf-8')
+        if text.endswith('\n'):
+            text = text[:-1]
+        if text.endswith('\r'):
+            text = text[:-1]
+        for line in text.split('\r'):  # Any lone '\r' is a line break too
+            rest = line.partition('//')[0]
+            if pending is None:
+                if '/*' not in rest:
+                    yield rest  # Fast path: no block comment starts here
+                    continue
+                head = ''
+            else:
+                head, held = pending
+                end = rest.find('*/')
+                if end == -1:
+                    held.append(rest)
+                    continue
+                rest = rest[end + 2:]
+                pending = None
+            while True:
+                start = rest.find('/*')
+                if start == -1:
+                    yield head + rest
+                    break
+                end = rest.find('*/', start + 2)
+                if end == -1:
+                    pending = (head + rest[:start], [rest[start:]])
+                    break
+                head += rest[:start]
+                rest = rest[end + 2:]
+    if pending is not None:
+        # Never closed: the comment text stays, exactly as read
+        head, held = pending
+        yield head + held[0]
+        yield from held[1:]
+
+
+def _parse_public_methods(lines: Iterable[str]) -> List[str]:
+    """Collect public method names from comment-free header lines"""
     methods = []
+    seen = set()
     in_public_section = False
     in_class = False
     brace_depth = 0
     
-    # Remove comments and strings
-    content_no_comments = re.sub(r'//.*?$', '', content, flags=re.MULTILINE)
-    content_no_comments = re.sub(r'/\*.*?\*/', '', content_no_comments, flags=re.DOTALL)
-    
-    lines = content_no_comments.split('\n')
-    
     for line in lines:
+        m = _RE_DISPATCH.match(line)
+        kind = m.lastgroup if m else None
+        
         # Detect class start
-        if re.search(r'\bclass\s+\w+', line) and '{' in line:
+        if kind == 'cls':
             in_class = True
             in_public_section = False
             brace_depth = line.count('{') - line.count('}')
@@ -108,23 +244,21 @@ def extract_public_methods(header_path: Path) -> List[str]:
             continue
         
         # Detect public: section
-        if re.search(r'\bpublic\s*:', line):
+        if kind == 'pub':
             in_public_section = True
             continue
         
         # Detect private: or protected: sections
-        if re.search(r'\b(private|protected)\s*:', line):
+        if kind == 'priv':
             in_public_section = False
             continue
         
         # Extract method declarations
-        if in_public_section:
-            method_match = re.search(r'\b(\w+)\s*\([^)]*\)\s*(?:const\s*)?(?:override\s*)?(?:=\s*0\s*)?[;{]', line)
-            if method_match:
-                method_name = method_match.group(1)
-                if method_name and method_name not in ['~', 'operator']:
-                    if method_name not in methods:
-                        methods.append(method_name)
+        if in_public_section and kind == 'meth':
+            method_name = m.group('meth')
+            if method_name not in seen and method_name not in ('~', 'operator'):
+                seen.add(method_name)
+                methods.append(method_name)
     
     return methods
 
@@ -141,7 +275,7 @@ def get_key_methods(all_methods: List[str], class_info: dict) -> List[str]:
     
     for method in all_methods:
         method_lower = method.lower()
-        if any(kw in method_lower for kw in ['handle', 'execute', 'setup', 'update', 'draw', 'set', 'get']):
+        if any(kw in method_lower for kw in _PRIORITY_KEYWORDS):
             priority.append(method)
         else:
             other.append(method)
@@ -161,69 +295,72 @@ def format_node_text(class_name: str, class_info: dict, methods: List[str], has_
     else:
         title = f"# {class_name}.h"
     
-    lines = [title, ""]
-    
-    # Add description
     description = class_info.get("description", "")
-    if description:
-        lines.append(f"*{description}*")
-        lines.append("")
     
-    # Add methods
-    if methods:
-        lines.append("**Key Methods:**")
-        for method in methods:
-            lines.append(f"- `{method}()`")
-    
-    return "\n".join(lines)
+    # Title, description and methods assembled in one join
+    parts = (
+        title,
+        "",
+        f"*{description}*" if description else None,
+        "" if description else None,
+        "**Key Methods:**" if methods else None,
+    )
+    method_lines = (f"- `{method}()`" for method in methods)
+    return "\n".join(chain((part for part in parts if part is not None), method_lines))
 
 
-def find_shell_node_position(canvas_data: dict) -> Optional[tuple]:
-    """Find the position of the Shell node"""
+def scan_canvas(canvas_data: dict) -> Dict[str, dict]:
+    """Map each class name titled in the canvas to its (first) text node in one pass"""
+    name_to_node = {}
     for node in canvas_data.get("nodes", []):
-        if node.get("type") == "text":
-            text = node.get("text", "")
-            if re.search(r'#\s*Shell\.', text):
-                return (node.get("x", 0), node.get("y", 0))
-    return None
+        if node.get("type") != "text":
+            continue
+        match = _RE_NODE_TITLE.search(node.get("text", ""))
+        if match:
+            name_to_node.setdefault(match.group(1), node)
+    return name_to_node
 
 
 def generate_node_id() -> str:
     """Generate a node ID matching Obsidian format"""
-    return uuid.uuid4().hex[:16]
+    return secrets.token_hex(8)
+
+
+def _probe_shell(class_info: dict) -> Tuple[List[str], bool]:
+    """Parse a shell's header and check for its .cpp file"""
+    header_path = SRC_DIR / class_info["file"]
+    cpp_path = SRC_DIR / class_info["file"].replace(".h", ".cpp")
+    hst = _stat_or_none(header_path)
+    cst = _stat_or_none(cpp_path)
+    methods = extract_public_methods(header_path, st=hst) if hst is not None else []
+    return methods, cst is not None
 
 
-def add_shell_nodes():
-    """Add missing shell system nodes to canvas"""
-    print(f"Reading canvas: {CANVAS_PATH}")
+def add_shell_nodes(canvas_data: dict, shell_classes: Optional[Dict[str, dict]] = None,
+                    first_slot: int = 0) -> dict:
+    """Add missing shell system nodes to canvas data (no file I/O).
     
-    # Read existing canvas
-    with open(CANVAS_PATH, 'r', encoding='utf-8') as f:
-        canvas_data = json.load(f)
+    New nodes stack below the Shell node; first_slot offsets the stacking index
+    so shells added by separate calls keep the same positions as a single call.
+    """
+    if shell_classes is None:
+        shell_classes = SHELL_CLASSES
     
     nodes = canvas_data.get("nodes", [])
     print(f"Found {len(nodes)} existing nodes")
     
-    # Check which shell classes already exist
-    existing_classes = set()
-    for node in nodes:
-        if node.get("type") == "text":
-            text = node.get("text", "")
-            match = re.search(r'#\s*(\w+)\.', text)
-            if match:
-                existing_classes.add(match.group(1))
-    
-    # Find Shell node position
-    shell_pos = find_shell_node_position(canvas_data)
-    if not shell_pos:
+    # Check which shell classes already exist and find Shell node position
+    existing_classes = scan_canvas(canvas_data)
+    shell_node = existing_classes.get("Shell")
+    if shell_node is None:
         print("⚠️  Shell node not found, using default position")
         shell_x, shell_y = 2140, -4320  # Default position based on canvas
     else:
-        shell_x, shell_y = shell_pos
+        shell_x, shell_y = shell_node.get("x", 0), shell_node.get("y", 0)
         print(f"Found Shell node at ({shell_x}, {shell_y})")
     
     # Determine which shells to add
-    missing_shells = [name for name in SHELL_CLASSES.keys() if name not in existing_classes]
+    missing_shells = [name for name in shell_classes.keys() if name not in existing_classes]
     print(f"\nMissing shell classes: {missing_shells}")
     
     # Add missing shell nodes
@@ -231,20 +368,24 @@ def add_shell_nodes():
     base_x = shell_x
     base_y = shell_y + 400  # Position below Shell node
     
-    for i, class_name in enumerate(missing_shells):
+    # Without a source tree every header lookup fails; use the predefined methods
+    src_available = SRC_DIR.exists()
+    
+    # Parse headers and probe .cpp files concurrently; nodes are assembled in order below
+    tasks = {name: shell_classes[name] for name in missing_shells if name != "Shell"}
+    probes = {}
+    if src_available and tasks:
+        with ThreadPoolExecutor(max_workers=HEADER_WORKERS) as pool:
+            probes = dict(zip(tasks, pool.map(_probe_shell, tasks.values())))
+    
+    for i, class_name in enumerate(missing_shells, start=first_slot):
         if class_name == "Shell":
             continue  # Shell already exists
         
-        class_info = SHELL_CLASSES[class_name]
+        class_info = shell_classes[class_name]
+        all_methods, has_cpp = probes.get(class_name, ([], False))
         
-        # Check if cpp file exists
-        header_path = SRC_DIR / class_info["file"]
-        cpp_path = SRC_DIR / class_info["file"].replace(".h", ".cpp")
-        has_cpp = cpp_path.exists()
-        
-        # Extract methods
         print(f"  Processing {class_name}...")
-        all_methods = extract_public_methods(header_path)
         key_methods = get_key_methods(all_methods, class_info)
         
         # Format node text
@@ -277,17 +418,69 @@ def add_shell_nodes():
             print(f"      Found {len(key_methods)} key methods")
     
     # Add new nodes to canvas
-    canvas_data["nodes"].extend(new_nodes)
+    canvas_data.setdefault("nodes", []).extend(new_nodes)
+    print(f"   Added {len(new_nodes)} new shell nodes")
+    
+    return canvas_data
+
+
+def _read_and_update(canvas_path: Path, updates: List[Dict[str, dict]], first_slot: int = 0) -> dict:
+    """Read a canvas and apply shell-class updates to it in memory.
+    
+    Each update continues stacking where the previous one stopped. A missing
+    Shell takes up a slot without getting a node (as in a single update), so
+    the next update starts after every slot the previous one used.
+    """
+    print(f"Reading canvas: {canvas_path}")
+    
+    # Read existing canvas
+    canvas_data = read_canvas(canvas_path)
+    
+    slot = first_slot
+    for shell_classes in updates:
+        existing_classes = scan_canvas(canvas_data)
+        add_shell_nodes(canvas_data, shell_classes, slot)
+        slot += sum(1 for name in shell_classes if name not in existing_classes)
+    
+    return canvas_data
+
+
+def apply_updates(canvas_path: Path, updates: List[Dict[str, dict]], first_slot: int = 0) -> dict:
+    """Apply several shell-class updates to a canvas with a single read and write"""
+    load_method_cache()
+    canvas_data = _read_and_update(canvas_path, updates, first_slot)
     
     # Write updated canvas
-    with open(CANVAS_PATH, 'w', encoding='utf-8') as f:
-        json.dump(canvas_data, f, indent="\t", ensure_ascii=False)
+    write_canvas(canvas_path, canvas_data)
+    save_method_cache()
     
-    print(f"\n✅ Canvas updated successfully!")
-    print(f"   Added {len(new_nodes)} new shell nodes")
-    print(f"   Total nodes: {len(canvas_data['nodes'])}")
+    return canvas_data
 
 
-if __name__ == "__main__":
-    add_shell_nodes()
+def main(batch: bool = False, canvas_paths: Optional[List[Path]] = None) -> None:
+    """Add missing shell nodes to each canvas in canvas_paths (default: CANVAS_PATH).
+    
+    Every canvas is read and written once. By default each canvas is written
+    as soon as it is updated; with batch=True all canvases are updated in
+    memory first and the writes are flushed together at the end.
+    """
+    if canvas_paths is None:
+        canvas_paths = [CANVAS_PATH]
+    
+    if batch:
+        load_method_cache()
+        pending = [(path, _read_and_update(path, [SHELL_CLASSES])) for path in canvas_paths]
+        for path, canvas_data in pending:
+            write_canvas(path, canvas_data)
+        save_method_cache()
+        results = [canvas_data for _, canvas_data in pending]
+    else:
+        results = [apply_updates(path, [SHELL_CLASSES]) for path in canvas_paths]
+    
+    for canvas_data in results:
+        print(f"\n✅ Canvas updated successfully!")
+        print(f"   Total nodes: {len(canvas_data['nodes'])}")
+
 
+if __name__ == "__main__":
+    main()
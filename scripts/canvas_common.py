@@ -0,0 +1,132 @@
+"""
+Helpers shared by the canvas update scripts.
+
+Source file lookup and brace matching used by update_all_nodes.py and
+update_node_titles.py, and the canvas JSON I/O shared by all canvas scripts.
+The scripts import this module from the directory they live in.
+"""
+
+import functools
+import json
+import os
+import re
+import stat
+from collections import namedtuple
+from pathlib import Path
+from typing import Optional
+
+try:
+    import orjson  # Optional C-accelerated JSON for canvas I/O
+except ImportError:
+    orjson = None
+
+# Subdirectories of the source tree searched (in order) after the top level
+SEARCH_SUBDIRS = ("core", "modules", "gui", "utils", "data", "input", "shell")
+
+# Result of processing one node: text is None for nodes left untouched;
+# cache_entry is (class_name, entry) when freshly parsed text should be cached
+NodeUpdate = namedtuple('NodeUpdate', 'node text log not_found cache_entry', defaults=(None,))
+
+# Leading two-space indentation units in orjson output (JSON strings never span lines)
+_RE_INDENT = re.compile(rb'^(?:  )+', re.MULTILINE)
+
+
+@functools.lru_cache(maxsize=None)
+def dir_entries(directory: Path) -> frozenset:
+    """Names in a directory, listed once (empty if it does not exist)"""
+    try:
+        return frozenset(os.listdir(directory))
+    except OSError:
+        return frozenset()
+
+
+def exists(path: Path) -> bool:
+    """Existence check answered from the cached listing of the parent directory"""
+    return path.name in dir_entries(path.parent)
+
+
+def search(src_dir: Path, base_name: str, exts: tuple, top_level: bool = True) -> Optional[Path]:
+    """Look for base_name with each extension in src_dir (unless top_level is False), then in SEARCH_SUBDIRS"""
+    directories = (src_dir,) if top_level else ()
+    for directory in (*directories, *(src_dir / subdir for subdir in SEARCH_SUBDIRS)):
+        for ext in exts:
+            path = directory / f"{base_name}{ext}"
+            if exists(path):
+                return path
+    return None
+
+
+def match_braces(s: str, start: int) -> int:
+    """Index of the '}' closing a brace opened just before `start`.
+    
+    Nested braces are skipped using str.find. If the brace is never closed,
+    returns len(s) - 1.
+    """
+    depth = 1
+    i = start
+    next_open = s.find('{', i)
+    while True:
+        next_close = s.find('}', i)
+        if next_close == -1:
+            return len(s) - 1
+        if next_open != -1 and next_open < next_close:
+            depth += 1
+            i = next_open + 1
+            next_open = s.find('{', i)
+            continue
+        depth -= 1
+        if depth == 0:
+            return next_close
+        i = next_close + 1
+
+
+def parse_canvas(payload: bytes) -> dict:
+    """Parse canvas JSON bytes, using orjson when available"""
+    if orjson is not None:
+        return orjson.loads(payload)
+    return json.loads(payload)
+
+
+def read_canvas(path: Path) -> dict:
+    """Load canvas JSON, using orjson when available"""
+    if orjson is not None:
+        return orjson.loads(path.read_bytes())
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def encode_canvas(canvas_data: dict) -> bytes:
+    """Serialize canvas JSON with tab indentation (Obsidian format) as UTF-8 bytes"""
+    if orjson is not None:
+        payload = orjson.dumps(canvas_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        return _RE_INDENT.sub(lambda m: b'\t' * (len(m.group(0)) // 2), payload)
+    return json.dumps(canvas_data, indent="\t", ensure_ascii=False).encode('utf-8')
+
+
+def write_canvas(path: Path, canvas_data: dict, payload: Optional[bytes] = None,
+                 atomic: bool = False) -> None:
+    """Write canvas JSON with tab indentation (Obsidian format).
+    
+    payload may carry canvas_data already encoded with encode_canvas, which is
+    then written as-is. With atomic=True the bytes go to a sibling temp file
+    that is renamed over path, so Obsidian (or a concurrent sync) only ever
+    sees the old or the new canvas, never a partially written one; the
+    canvas keeps its permission bits and the temp file is removed on failure.
+    """
+    if payload is None:
+        payload = encode_canvas(canvas_data)
+    if not atomic:
+        path.write_bytes(payload)
+        return
+    tmp = path.with_suffix(".canvas.tmp")
+    try:
+        tmp.write_bytes(payload)
+        # The temp file is created with the default umask; keep the canvas's own mode
+        try:
+            os.chmod(tmp, stat.S_IMODE(path.stat().st_mode))
+        except FileNotFoundError:
+            pass
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
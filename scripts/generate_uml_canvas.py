@@ -10,12 +10,19 @@ This script:
 5. Saves it to the Obsidian vault
 """
 
+import hashlib
 import json
 import re
 from pathlib import Path
-from collections import defaultdict
+from collections import defaultdict, namedtuple
 from typing import Dict, List, Set, Tuple, Optional
-import uuid
+
+from canvas_common import read_canvas
+
+try:
+    import orjson  # Optional C-accelerated JSON for canvas output
+except ImportError:
+    orjson = None
 
 # Configuration
 CODEBASE_ROOT = Path(__file__).parent.parent
@@ -110,6 +117,16 @@ UML_LAYERS = {
     }
 }
 
+# Layer definitions frozen into records for attribute access
+Layer = namedtuple('Layer', 'classes x y color label')
+_LAYERS = {name: Layer(**info) for name, info in UML_LAYERS.items()}
+
+# Reverse index: class name -> layer name
+_CLASS_TO_LAYER = {c: name for name, layer in _LAYERS.items() for c in layer.classes}
+
+# Classes rendered as abstract
+_ABSTRACT_SET = frozenset({"Module", "ModuleGUI", "BaseCell", "ofBaseApp"})
+
 # Inheritance relationships (child -> parent)
 INHERITANCE = {
     "ofApp": "ofBaseApp",
@@ -170,14 +187,27 @@ INHERITANCE_INDENT = 80  # Horizontal indent for child classes
 LAYER_SPACING_X = 900  # Space between layers
 LAYER_HEADER_HEIGHT = 120
 
+# ID prefixes of nodes/edges created by this script (other IDs are user-created)
+GENERATED_ID_PREFIXES = ("class-", "header-", "group-", "inherit-", "comp-", "assoc-")
+
+# Top-left position of the first class node in each layer (below the layer header)
+_LAYER_BASES = {name: (layer.x, layer.y + LAYER_HEADER_HEIGHT) for name, layer in _LAYERS.items()}
+
+
+def class_node_id(name: str) -> str:
+    """Stable node ID derived from the class name (identical across runs)"""
+    return f"class-{hashlib.blake2s(name.encode(), digest_size=4).hexdigest()}"
+
 
 class UMLClass:
     """Represents a UML class node"""
+    __slots__ = ('name', 'node_id', 'layer', 'is_abstract', 'x', 'y', 'parent_class', 'children')
+    
     def __init__(self, name: str, layer: str = None):
         self.name = name
-        self.node_id = f"class-{uuid.uuid4().hex[:8]}"
+        self.node_id = class_node_id(name)
         self.layer = layer or self._find_layer()
-        self.is_abstract = name in ["Module", "ModuleGUI", "BaseCell", "ofBaseApp"]
+        self.is_abstract = name in _ABSTRACT_SET
         self.x = 0
         self.y = 0
         self.parent_class = INHERITANCE.get(name)
@@ -185,10 +215,7 @@ class UMLClass:
         
     def _find_layer(self) -> str:
         """Find which layer this class belongs to"""
-        for layer_name, layer_info in UML_LAYERS.items():
-            if self.name in layer_info["classes"]:
-                return layer_name
-        return "utilities"
+        return _CLASS_TO_LAYER.get(self.name, "utilities")
     
     def get_display_text(self) -> str:
         """Get formatted text for the class node"""
@@ -204,8 +231,8 @@ def parse_class_definitions() -> Dict[str, UMLClass]:
     
     # Known classes from UML reference
     all_classes = set()
-    for layer_info in UML_LAYERS.values():
-        all_classes.update(layer_info["classes"])
+    for layer in _LAYERS.values():
+        all_classes.update(layer.classes)
     
     # Add classes from inheritance map
     all_classes.update(INHERITANCE.keys())
@@ -226,24 +253,15 @@ def parse_class_definitions() -> Dict[str, UMLClass]:
 
 def layout_classes(classes: Dict[str, UMLClass]) -> None:
     """Simple grid layout by layer"""
-    # Group by layer
-    by_layer: Dict[str, List[UMLClass]] = defaultdict(list)
-    for cls in classes.values():
-        by_layer[cls.layer].append(cls)
+    counters = {name: 0 for name in _LAYERS}
     
-    # Simple grid layout for each layer
-    for layer_name, layer_classes in by_layer.items():
-        layer_info = UML_LAYERS.get(layer_name, {})
-        x_base = layer_info.get("x", 0)
-        y_base = layer_info.get("y", 0) + LAYER_HEADER_HEIGHT
-        
-        # Sort classes: abstract first, then alphabetically
-        layer_classes.sort(key=lambda c: (not c.is_abstract, c.name))
-        
-        # Simple vertical stack
-        for i, cls in enumerate(layer_classes):
-            cls.x = x_base
-            cls.y = y_base + i * NODE_SPACING_Y
+    # Within each layer: abstract first, then alphabetically; simple vertical stack
+    for cls in sorted(classes.values(), key=lambda c: (c.layer, not c.is_abstract, c.name)):
+        x_base, y_base = _LAYER_BASES.get(cls.layer, (0, LAYER_HEADER_HEIGHT))
+        index = counters.get(cls.layer, 0)
+        cls.x = x_base
+        cls.y = y_base + index * NODE_SPACING_Y
+        counters[cls.layer] = index + 1
 
 
 def create_canvas_json(classes: Dict[str, UMLClass]) -> dict:
@@ -251,23 +269,31 @@ def create_canvas_json(classes: Dict[str, UMLClass]) -> dict:
     canvas_nodes = []
     canvas_edges = []
     
+    # Obsidian color index per layer (hex colors map to "1"; None if the layer has no color)
+    # Obsidian uses color indices: "1" through "6" for built-in colors
+    layer_colors = {
+        name: (c if isinstance(c, str) and c.isdigit() else "1") if c else None
+        for name, layer in _LAYERS.items()
+        for c in [layer.color]
+    }
+    
     # Create layer headers
-    for layer_name, layer_info in UML_LAYERS.items():
+    for layer_name, layer in _LAYERS.items():
         # JSON Canvas 1.0 compliant header
         header = {
             "id": f"header-{layer_name}",
             "type": "text",
-            "x": float(layer_info["x"]),
-            "y": float(layer_info["y"]),
+            "x": float(layer.x),
+            "y": float(layer.y),
             "width": float(300),
             "height": float(80),
-            "text": f"**{layer_info['label']}**"
+            "text": f"**{layer.label}**"
         }
         
         # Add color if specified
-        layer_color = layer_info.get("color", "1")
+        layer_color = layer_colors[layer_name]
         if layer_color:
-            header["color"] = str(layer_color) if isinstance(layer_color, str) and layer_color.isdigit() else "1"
+            header["color"] = layer_color
         
         # fontSize is not in JSON Canvas 1.0 spec - remove it for Advanced Canvas compatibility
         canvas_nodes.append(header)
@@ -290,11 +316,9 @@ def create_canvas_json(classes: Dict[str, UMLClass]) -> dict:
         }
         
         # Color is optional in JSON Canvas spec - add only if we have a valid color
-        layer_color = UML_LAYERS.get(cls.layer, {}).get("color", "1")
+        layer_color = layer_colors.get(cls.layer, "1")
         if layer_color:
-            # Convert hex color to Obsidian color index if needed
-            # Obsidian uses color indices: "1" through "6" for built-in colors
-            node["color"] = str(layer_color) if layer_color.isdigit() else "1"
+            node["color"] = layer_color
         
         # Ensure no extra properties that Advanced Canvas might reject
         canvas_nodes.append(node)
@@ -375,6 +399,135 @@ def create_canvas_json(classes: Dict[str, UMLClass]) -> dict:
     return canvas_json
 
 
+def _encode_fragment(item) -> str:
+    """Serialize a single node, edge or other top-level value as compact JSON"""
+    if orjson is not None:
+        return orjson.dumps(item).decode()
+    return json.dumps(item, ensure_ascii=False, separators=(",", ":"))
+
+
+def encode_canvas(canvas_data: dict) -> str:
+    """Serialize canvas JSON as one compact node/edge per line.
+    
+    This only swaps the encoder: the canvas dict is built as before and each
+    node and edge is dumped on its own line. Every top-level key is written in
+    its original order, so keys such as "metadata" kept from an existing canvas
+    survive. The file is no longer pretty-printed with indent=2.
+    """
+    def join(items: List[dict]) -> str:
+        if not items:
+            return "[]"
+        return "[\n" + ",\n".join(_encode_fragment(item) for item in items) + "\n]"
+    
+    parts = (
+        f'{_encode_fragment(key)}:{join(value) if key in ("nodes", "edges") else _encode_fragment(value)}'
+        for key, value in canvas_data.items()
+    )
+    return "{" + ",".join(parts) + "}\n"
+
+
+def _merge_items(old_items: List[dict], new_items: List[dict],
+                 keep_keys: Tuple[str, ...]) -> Tuple[List[dict], List[str], List[str], List[str]]:
+    """Merge generated items into existing ones by ID.
+    
+    Existing items keep their place in the list, any extra keys, and the values
+    of keep_keys; generated items no longer produced are dropped; user-created
+    items (IDs without a generated prefix) are left alone.
+    """
+    new_by_id = {item["id"]: item for item in new_items}
+    merged: List[dict] = []
+    added: List[str] = []
+    removed: List[str] = []
+    modified: List[str] = []
+    
+    for item in old_items:
+        item_id = item.get("id")
+        new_item = new_by_id.pop(item_id, None)
+        if new_item is None:
+            if isinstance(item_id, str) and item_id.startswith(GENERATED_ID_PREFIXES):
+                removed.append(item_id)
+            else:
+                merged.append(item)
+            continue
+        
+        updated = dict(item)
+        updated.update((k, v) for k, v in new_item.items() if k not in keep_keys or k not in item)
+        if updated != item:
+            modified.append(item_id)
+        merged.append(updated)
+    
+    for item_id, new_item in new_by_id.items():
+        added.append(item_id)
+        merged.append(new_item)
+    
+    return merged, added, removed, modified
+
+
+def _rekey_by_text(old_nodes: List[dict], new_nodes: List[dict]) -> Tuple[List[dict], Dict[str, str]]:
+    """Give old generated nodes the ID of the generated node with the same text.
+    
+    Canvases written before class IDs were derived from the class name carry
+    random class-... IDs; matching those by text lets them keep their position
+    instead of being dropped and re-added at the default layout spot.
+    Returns the (possibly re-keyed) old nodes and a map of old ID -> new ID.
+    """
+    new_ids = {node["id"] for node in new_nodes}
+    old_ids = {node.get("id") for node in old_nodes}
+    by_text = {node["text"]: node["id"] for node in new_nodes
+               if "text" in node and node["id"] not in old_ids}
+    id_map: Dict[str, str] = {}
+    rekeyed: List[dict] = []
+    
+    for node in old_nodes:
+        node_id = node.get("id")
+        if (by_text and isinstance(node_id, str) and node_id not in new_ids
+                and node_id.startswith(GENERATED_ID_PREFIXES)):
+            new_id = by_text.pop(node.get("text"), None)
+            if new_id is not None:
+                id_map[node_id] = new_id
+                node = dict(node, id=new_id)
+        rekeyed.append(node)
+    
+    return rekeyed, id_map
+
+
+def merge_canvas(old_canvas: dict, new_canvas: dict) -> Tuple[dict, List[str], List[str], List[str]]:
+    """Apply a freshly generated canvas onto an existing one.
+    
+    Only added/removed/modified nodes and edges change; positions of existing
+    nodes are preserved so manual layout edits survive regeneration. Nodes from
+    canvases with older random class IDs are matched to the new IDs by text.
+    """
+    old_nodes, id_map = _rekey_by_text(old_canvas.get("nodes", []), new_canvas["nodes"])
+    old_edges = []
+    for edge in old_canvas.get("edges", []):
+        if edge.get("fromNode") in id_map or edge.get("toNode") in id_map:
+            edge = dict(edge)
+            for end in ("fromNode", "toNode"):
+                if end in edge:
+                    edge[end] = id_map.get(edge[end], edge[end])
+        old_edges.append(edge)
+    
+    nodes, added, removed, modified = _merge_items(old_nodes, new_canvas["nodes"], keep_keys=("x", "y"))
+    edges, e_added, e_removed, e_modified = _merge_items(old_edges, new_canvas["edges"], keep_keys=())
+    # Re-keyed nodes count as modified even when nothing but their ID changed
+    modified.extend(new_id for new_id in id_map.values() if new_id not in modified)
+    
+    # Drop edges whose endpoints no longer exist
+    node_ids = {n.get("id") for n in nodes}
+    kept_edges = []
+    for edge in edges:
+        if edge.get("fromNode") in node_ids and edge.get("toNode") in node_ids:
+            kept_edges.append(edge)
+        else:
+            e_removed.append(edge.get("id"))
+    
+    merged = dict(old_canvas)
+    merged["nodes"] = nodes
+    merged["edges"] = kept_edges
+    return merged, added + e_added, removed + e_removed, modified + e_modified
+
+
 def create_layer_groups(classes: Dict[str, UMLClass]) -> List[dict]:
     """Create group containers for each layer (optional visual grouping)"""
     groups = []
@@ -387,7 +540,11 @@ def create_layer_groups(classes: Dict[str, UMLClass]) -> List[dict]:
         if not layer_classes:
             continue
         
-        layer_info = UML_LAYERS.get(layer_name, {})
+        layer = _LAYERS.get(layer_name)
+        if layer is not None:
+            layer_y, color, label = layer.y, layer.color, layer.label
+        else:
+            layer_y, color, label = 0, "1", layer_name
         
         # Calculate bounding box
         min_x = min(c.x for c in layer_classes) - 50
@@ -399,11 +556,11 @@ def create_layer_groups(classes: Dict[str, UMLClass]) -> List[dict]:
             "id": f"group-{layer_name}",
             "type": "group",
             "x": min_x,
-            "y": layer_info.get("y", 0) + LAYER_HEADER_HEIGHT - 50,
+            "y": layer_y + LAYER_HEADER_HEIGHT - 50,
             "width": max_x - min_x,
             "height": max_y - min_y + 50,
-            "color": layer_info.get("color", "1"),
-            "label": layer_info.get("label", layer_name)
+            "color": color,
+            "label": label
         }
         # Groups are editable by default in Obsidian
         groups.append(group)
@@ -439,12 +596,26 @@ def main():
     # Ensure Obsidian vault directory exists
     OBSIDIAN_VAULT.mkdir(parents=True, exist_ok=True)
     
-    # Write canvas file with JSON Canvas 1.0 strict compliance
     canvas_path = OBSIDIAN_VAULT / CANVAS_NAME
-    with open(canvas_path, 'w', encoding='utf-8') as f:
-        # Use ensure_ascii=False to preserve any special characters
-        # Use strict JSON formatting for Advanced Canvas compatibility
-        json.dump(canvas_data, f, indent=2, ensure_ascii=False)
+    changed = True
+    
+    # Incremental update: merge into the existing canvas instead of replacing it
+    if canvas_path.exists():
+        try:
+            existing = read_canvas(canvas_path)
+        except ValueError:
+            print("   (Existing canvas is not valid JSON, rewriting it)")
+        else:
+            canvas_data, added, removed, modified = merge_canvas(existing, canvas_data)
+            changed = bool(added or removed or modified)
+            print(f"   Incremental update: {len(added)} added, {len(removed)} removed, {len(modified)} modified")
+    
+    # Write canvas file with JSON Canvas 1.0 strict compliance
+    # Non-ASCII characters are written as-is; strict JSON formatting for Advanced Canvas compatibility
+    if changed:
+        canvas_path.write_text(encode_canvas(canvas_data), encoding='utf-8')
+    else:
+        print("   Canvas already up to date, file not rewritten")
     
     # Ensure file is writable
     import os
@@ -9,17 +9,30 @@ Comprehensive script to update all canvas nodes with:
 This combines functionality from update_node_titles.py and add_shell_nodes.py
 """
 
+import functools
 import json
+import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Dict, List, Optional
 
+from canvas_common import NodeUpdate, dir_entries, exists, match_braces, read_canvas, search, write_canvas
+
 # Canvas file path
 CANVAS_PATH = Path.home() / "works" / "notes" / "Programming" / "videoTracker" / "videoTracker UML Diagram.canvas"
 
 # Source directory
 SRC_DIR = Path("/Users/jaufre/works/of_v0.12.1_osx_release/apps/myApps/videoTracker/src")
 
+# Formatted-text cache: class name -> {"sources": [header_mtime_ns, cpp_mtime_ns], "text"}
+NODE_CACHE_PATH = Path.home() / ".cache" / "videoTracker" / "node_cache.json"
+NODE_CACHE_VERSION = 1  # Bump when extraction or formatting changes
+_node_cache: Dict[str, dict] = {}
+
+# Worker threads for per-node header parsing
+NODE_WORKERS = min(8, os.cpu_count() or 4)
+
 # Class name to file mapping (for classes that don't follow standard naming)
 CLASS_TO_FILE = {
     "ofApp": "ofApp",
@@ -32,14 +45,14 @@ CLASS_TO_FILE = {
 }
 
 # Methods that indicate interaction with other modules
-INTERACTION_KEYWORDS = {
+INTERACTION_KEYWORDS = frozenset({
     "get", "set", "connect", "disconnect", "register", "add", "remove",
     "create", "execute", "load", "save", "subscribe", "unsubscribe",
     "route", "process", "update", "notify", "find", "query"
-}
+})
 
 # Methods to exclude (too generic or internal)
-EXCLUDE_METHODS = {
+EXCLUDE_METHODS = frozenset({
     "getType", "getName", "getInstanceName", "setInstanceName",
     "toJson", "fromJson", "serialize", "deserialize",
     "setup", "update", "draw", "audioOut", "videoOut",
@@ -47,9 +60,129 @@ EXCLUDE_METHODS = {
     "getX", "getY", "setX", "setY", "getPosition", "setPosition",
     "getColor", "setColor", "isVisible", "setVisible",
     "getParent", "setParent", "getChildren", "addChild", "removeChild"
+})
+
+# Names never reported as methods: typed declarations skip operators and excluded
+# methods; untyped matches additionally skip type keywords
+_TYPED_REJECTS = frozenset({'~', 'operator'}) | EXCLUDE_METHODS
+_KEYWORD_REJECTS = frozenset({'bool', 'void', 'int', 'float', 'string', 'std'}) | _TYPED_REJECTS
+
+# Fallback class descriptions used when a header has no doc comment
+_FALLBACK_DESCRIPTIONS = {
+    "EngineState": "Immutable snapshot of engine state for rendering",
+    "Engine": "Central headless core managing modules and execution",
+    "ConnectionManager": "Unified connection management for audio/video/parameters",
+    "ModuleRegistry": "Centralized storage and lookup for module instances",
+    "ModuleFactory": "Factory for creating module instances",
+    "ParameterRouter": "Routes parameter changes between modules",
+    "SessionManager": "Manages saving and loading application sessions",
+    "ProjectManager": "Manages project files and assets",
+    "PatternRuntime": "Runtime system for pattern evaluation",
+    "ScriptManager": "Generates and manages Lua scripts from state",
+    "Clock": "Central timing system for audio/video synchronization",
+    "CommandExecutor": "Executes commands with undo/redo support",
+    "AudioRouter": "Routes audio signals between modules",
+    "VideoRouter": "Routes video signals between modules",
+    "EventRouter": "Manages event subscriptions between modules",
+    "AssetLibrary": "Manages media assets and references",
+    "MediaConverter": "Converts between media formats",
+    "InputRouter": "Routes input events to modules",
+    "ExpressionParser": "Parses mathematical expressions",
+    # Module classes
+    "Oscilloscope": "Audio visualization module displaying waveform oscilloscope",
+    "Spectrogram": "Audio visualization module displaying frequency spectrum",
+    "MediaPlayer": "Module for playing audio and video media files",
+    "VoiceProcessor": "Processes individual voice instances in MultiSampler",
+    "AudioOutput": "Master audio output module routing to system audio",
+    "AudioMixer": "Mixes multiple audio signals into a single output",
+    "TrackerSequencer": "Pattern-based step sequencer for triggering modules",
+    "Sequencer": "Base class for sequencer modules",
+    "MultiSampler": "Multi-voice sampler instrument with polyphonic playback",
+    "VideoOutput": "Master video output module routing to display",
+    "VideoMixer": "Mixes multiple video signals into a single output",
+    # GUI classes
+    "MenuBar": "Top menu bar with file operations and view controls",
+    "ClockGUI": "GUI panel for Clock timing controls",
+    "Console": "Command-line console interface for executing commands",
+    "ViewManager": "Manages visibility and layout of GUI panels",
+    "TrackerSequencerGUI": "GUI panel for TrackerSequencer module",
+    "CommandBar": "Command palette interface for quick command access",
+    "MultiSamplerGUI": "GUI panel for MultiSampler module",
+    # Application
+    "ofApp": "Main application class inheriting from ofBaseApp",
+    # Pattern system
+    "Pattern": "Data structure representing a sequence pattern",
+    "PatternChain": "Chain of patterns with repeat counts and enabled states",
+    "VoiceManager": "Manages voice pool allocation and polyphony for MultiSampler",
+    "ParameterDescriptor": "Metadata descriptor for module parameters",
+    "Envelope": "ADSR envelope generator for audio synthesis",
+    # Structs and data types
+    "TriggerEvent": "Event data for discrete step triggers with parameters",
+    "Port": "Describes an input or output port on a module for routing",
+    "SampleRef": "Contains shared audio data and video path for efficient memory usage",
+    "Voice": "Represents an active playback instance in MultiSampler",
+    "ofBaseApp": "Base class from openFrameworks framework (external dependency)",
+    # Module system
+    "Module": "Unified base class for all modules (sequencers, instruments, effects, utilities)",
+    # Shell system
+    "Shell": "Base class for different UI interaction modes",
+    "EditorShell": "Wraps existing ImGui-based editor interface with tiled windows",
+    "CommandShell": "Custom-rendered terminal interface with REPL (Hydra/Strudel style)",
+    "CodeShell": "Live-coding shell with code editor and REPL (Strudel/Tidal/Hydra style)",
+    "CLIShell": "Batch CLI mode for non-interactive command execution",
 }
 
+# Precompiled patterns
+_COMMENT_LINE_RE = re.compile(r'//.*?$', re.MULTILINE)
+_COMMENT_BLOCK_RE = re.compile(r'/\*.*?\*/', re.DOTALL)
+_DQ_STRING_RE = re.compile(r'"[^"]*"')
+_SQ_STRING_RE = re.compile(r"'[^']*'")
+_CLASS_DEF_RE = re.compile(r'\bclass\s+(\w+)\s*\{')
+_PUBLIC_RE = re.compile(r'\bpublic\s*:')
+_PRIV_PROT_RE = re.compile(r'\b(private|protected)\s*:')
+_DOC_BLOCK_RE = re.compile(r'/\*\*\s*(.*?)\s*\*/', re.DOTALL)
+_STAR_SPACE_RE = re.compile(r'\*\s*')
+_WS_RE = re.compile(r'\s+')
+_STRUCT_METHOD_RE = re.compile(r'(\w+)\s*\([^)]*\)\s*(?:const\s*)?(?:=\s*0\s*)?[;{]')
+# Method declaration, with group 'type' set when an explicit return type precedes the name
+_METHOD_ANY_RE = re.compile(
+    r'(?:\b(?P<type>bool|void|int|float|std::\w+(?:\s*<\s*[^>]+\s*>)?)\s+)?'
+    r'\b(\w+)\s*\([^)]*\)\s*(?:const\s*)?(?:override\s*)?(?:=\s*0\s*)?[;{]'
+)
+_NODE_HDR_RE = re.compile(r'#\s*(\w+)\.(?:cpp/)?h')
+_ABSTRACT_RE = re.compile(r'\*(\w+)\*')
+
+# Method-name priority tiers (matched against the lowercased name)
+_HIGH_PRIO_RE = re.compile(r'connect|disconnect|register|execute|route|subscribe|unsubscribe')
+_GETTER_KIND_RE = re.compile(r'module|manager|router|registry|factory|connection|state')
+_NOTIFY_RE = re.compile(r'notify|on|set')
+_PERSIST_RE = re.compile(r'load|save|serialize|deserialize')
+
+
+@functools.lru_cache(maxsize=None)
+def _class_def_for(name: str, word_start: bool = True) -> re.Pattern:
+    """Pattern for a class/struct definition of `name` (optionally without a leading word boundary)"""
+    prefix = r'\b' if word_start else ''
+    return re.compile(rf'{prefix}(class|struct)\s+{re.escape(name)}\b')
+
+
+@functools.lru_cache(maxsize=None)
+def _struct_def_for(name: str) -> re.Pattern:
+    """Pattern for a struct definition of `name`"""
+    return re.compile(rf'\bstruct\s+{re.escape(name)}\b')
+
+
+def _reset_index() -> None:
+    """Forget cached directory listings, lookups and header parses (e.g. after changing SRC_DIR)"""
+    dir_entries.cache_clear()
+    _read_header.cache_clear()
+    _stripped_header.cache_clear()
+    _public_methods_for.cache_clear()
+    find_class_file.cache_clear()
+    find_cpp_file.cache_clear()
+
 
+@functools.lru_cache(maxsize=None)
 def find_class_file(class_name: str) -> Optional[Path]:
     """Find the header file for a class"""
     # Check explicit mapping first
@@ -58,35 +191,18 @@ def find_class_file(class_name: str) -> Optional[Path]:
         # Handle paths with subdirectories (e.g., "modules/Module")
         if "/" in base_name:
             path = SRC_DIR / f"{base_name}.h"
-            if path.exists():
+            if exists(path):
                 return path
         else:
-            for ext in [".h", ".hpp"]:
-                path = SRC_DIR / f"{base_name}{ext}"
-                if path.exists():
-                    return path
-            # Try subdirectories
-            for subdir in ["core", "modules", "gui", "utils", "data", "input", "shell"]:
-                path = SRC_DIR / subdir / f"{base_name}{ext}"
-                if path.exists():
-                    return path
-    
-    # Standard search
-    for ext in [".h", ".hpp"]:
-        path = SRC_DIR / f"{class_name}{ext}"
-        if path.exists():
-            return path
-    
-    # Search in subdirectories
-    for subdir in ["core", "modules", "gui", "utils", "data", "input", "shell"]:
-        for ext in [".h", ".hpp"]:
-            path = SRC_DIR / subdir / f"{class_name}{ext}"
-            if path.exists():
+            path = search(SRC_DIR, base_name, (".h", ".hpp"))
+            if path:
                 return path
     
-    return None
+    # Standard search
+    return search(SRC_DIR, class_name, (".h", ".hpp"))
 
 
+@functools.lru_cache(maxsize=None)
 def find_cpp_file(class_name: str) -> Optional[Path]:
     """Find the cpp file for a class (if exists)"""
     # Check explicit mapping first
@@ -94,119 +210,59 @@ def find_cpp_file(class_name: str) -> Optional[Path]:
         base_name = CLASS_TO_FILE[class_name]
         if "/" in base_name:
             path = SRC_DIR / f"{base_name.replace('.h', '.cpp')}"
-            if path.exists():
+            if exists(path):
                 return path
         else:
-            path = SRC_DIR / f"{base_name}.cpp"
-            if path.exists():
+            path = search(SRC_DIR, base_name, (".cpp",))
+            if path:
                 return path
-            for subdir in ["core", "modules", "gui", "utils", "data", "input", "shell"]:
-                path = SRC_DIR / subdir / f"{base_name}.cpp"
-                if path.exists():
-                    return path
     
     # Standard search
-    path = SRC_DIR / f"{class_name}.cpp"
-    if path.exists():
-        return path
-    
-    # Search in subdirectories
-    for subdir in ["core", "modules", "gui", "utils", "data", "input", "shell"]:
-        path = SRC_DIR / subdir / f"{class_name}.cpp"
-        if path.exists():
-            return path
-    
-    return None
+    return search(SRC_DIR, class_name, (".cpp",))
+
+
+@functools.lru_cache(maxsize=None)
+def _read_header(path: Path) -> str:
+    """Header source, read once per path ("" if it cannot be read)"""
+    try:
+        return path.read_text(encoding='utf-8')
+    except Exception:
+        return ""
+
+
+@functools.lru_cache(maxsize=None)
+def _stripped_header(path: Path) -> str:
+    """Header source with comments removed and string/char literals emptied"""
+    content = _COMMENT_LINE_RE.sub('', _read_header(path))
+    content = _COMMENT_BLOCK_RE.sub('', content)
+    content = _DQ_STRING_RE.sub('""', content)
+    return _SQ_STRING_RE.sub("''", content)
 
 
 def get_fallback_description(class_name: str) -> str:
     """Generate a fallback description based on class name patterns"""
-    fallbacks = {
-        "EngineState": "Immutable snapshot of engine state for rendering",
-        "Engine": "Central headless core managing modules and execution",
-        "ConnectionManager": "Unified connection management for audio/video/parameters",
-        "ModuleRegistry": "Centralized storage and lookup for module instances",
-        "ModuleFactory": "Factory for creating module instances",
-        "ParameterRouter": "Routes parameter changes between modules",
-        "SessionManager": "Manages saving and loading application sessions",
-        "ProjectManager": "Manages project files and assets",
-        "PatternRuntime": "Runtime system for pattern evaluation",
-        "ScriptManager": "Generates and manages Lua scripts from state",
-        "Clock": "Central timing system for audio/video synchronization",
-        "CommandExecutor": "Executes commands with undo/redo support",
-        "AudioRouter": "Routes audio signals between modules",
-        "VideoRouter": "Routes video signals between modules",
-        "EventRouter": "Manages event subscriptions between modules",
-        "AssetLibrary": "Manages media assets and references",
-        "MediaConverter": "Converts between media formats",
-        "InputRouter": "Routes input events to modules",
-        "ExpressionParser": "Parses mathematical expressions",
-        # Module classes
-        "Oscilloscope": "Audio visualization module displaying waveform oscilloscope",
-        "Spectrogram": "Audio visualization module displaying frequency spectrum",
-        "MediaPlayer": "Module for playing audio and video media files",
-        "VoiceProcessor": "Processes individual voice instances in MultiSampler",
-        "AudioOutput": "Master audio output module routing to system audio",
-        "AudioMixer": "Mixes multiple audio signals into a single output",
-        "TrackerSequencer": "Pattern-based step sequencer for triggering modules",
-        "Sequencer": "Base class for sequencer modules",
-        "MultiSampler": "Multi-voice sampler instrument with polyphonic playback",
-        "VideoOutput": "Master video output module routing to display",
-        "VideoMixer": "Mixes multiple video signals into a single output",
-        # GUI classes
-        "MenuBar": "Top menu bar with file operations and view controls",
-        "ClockGUI": "GUI panel for Clock timing controls",
-        "Console": "Command-line console interface for executing commands",
-        "ViewManager": "Manages visibility and layout of GUI panels",
-        "TrackerSequencerGUI": "GUI panel for TrackerSequencer module",
-        "CommandBar": "Command palette interface for quick command access",
-        "MultiSamplerGUI": "GUI panel for MultiSampler module",
-        # Application
-        "ofApp": "Main application class inheriting from ofBaseApp",
-        # Pattern system
-        "Pattern": "Data structure representing a sequence pattern",
-        "PatternChain": "Chain of patterns with repeat counts and enabled states",
-        "VoiceManager": "Manages voice pool allocation and polyphony for MultiSampler",
-        "ParameterDescriptor": "Metadata descriptor for module parameters",
-        "Envelope": "ADSR envelope generator for audio synthesis",
-        # Structs and data types
-        "TriggerEvent": "Event data for discrete step triggers with parameters",
-        "Port": "Describes an input or output port on a module for routing",
-        "SampleRef": "Contains shared audio data and video path for efficient memory usage",
-        "Voice": "Represents an active playback instance in MultiSampler",
-        "ofBaseApp": "Base class from openFrameworks framework (external dependency)",
-        # Module system
-        "Module": "Unified base class for all modules (sequencers, instruments, effects, utilities)",
-        # Shell system
-        "Shell": "Base class for different UI interaction modes",
-        "EditorShell": "Wraps existing ImGui-based editor interface with tiled windows",
-        "CommandShell": "Custom-rendered terminal interface with REPL (Hydra/Strudel style)",
-        "CodeShell": "Live-coding shell with code editor and REPL (Strudel/Tidal/Hydra style)",
-        "CLIShell": "Batch CLI mode for non-interactive command execution",
-    }
-    return fallbacks.get(class_name, "")
-
-
-def extract_class_description(header_path: Path, class_name: str) -> str:
-    """Extract class description from header file comments"""
-    if not header_path.exists():
-        return get_fallback_description(class_name)
+    return _FALLBACK_DESCRIPTIONS.get(class_name, "")
+
+
+def extract_class_description(header_path: Path, class_name: str, fallback: Optional[str] = None) -> str:
+    """Extract class description from header file comments.
     
-    try:
-        content = header_path.read_text(encoding='utf-8')
-    except Exception:
-        return get_fallback_description(class_name)
+    fallback is returned when no description is found; it defaults to
+    get_fallback_description(class_name).
+    """
+    if fallback is None:
+        fallback = get_fallback_description(class_name)
+    
+    content = _read_header(header_path)
     
     # Find the class or struct definition
     # Use word boundary to avoid matching "ModuleRegistry" when looking for "Module"
-    class_pattern = rf'\b(class|struct)\s+{re.escape(class_name)}\b'
-    class_match = re.search(class_pattern, content)
+    class_match = _class_def_for(class_name).search(content)
     if not class_match:
         # For structs, also try without word boundary
-        class_pattern = rf'(struct|class)\s+{re.escape(class_name)}\b'
-        class_match = re.search(class_pattern, content)
+        class_match = _class_def_for(class_name, word_start=False).search(content)
         if not class_match:
-            return get_fallback_description(class_name)
+            return fallback
     
     # Look backwards from class definition for documentation comment
     # But only look back a reasonable distance (avoid matching wrong comments)
@@ -216,7 +272,7 @@ def extract_class_description(header_path: Path, class_name: str) -> str:
     before_class = content[search_start:start_pos]
     
     # Find the last /** ... */ comment block before the class
-    doc_blocks = list(re.finditer(r'/\*\*\s*(.*?)\s*\*/', before_class, re.DOTALL))
+    doc_blocks = list(_DOC_BLOCK_RE.finditer(before_class))
     
     if doc_blocks:
         # Get the last comment block before the class
@@ -238,8 +294,8 @@ def extract_class_description(header_path: Path, class_name: str) -> str:
                 desc = first_line
             
             # Clean up: remove asterisks, extra spaces
-            desc = re.sub(r'\*\s*', '', desc)
-            desc = re.sub(r'\s+', ' ', desc).strip()
+            desc = _STAR_SPACE_RE.sub('', desc)
+            desc = _WS_RE.sub(' ', desc).strip()
             
             # Limit length
             if len(desc) > 120:
@@ -249,22 +305,15 @@ def extract_class_description(header_path: Path, class_name: str) -> str:
                 return desc
     
     # Fallback to pattern-based description
-    return get_fallback_description(class_name)
+    return fallback
 
 
 def extract_struct_members(header_path: Path, struct_name: str) -> List[str]:
     """Extract public members/methods from a struct definition"""
-    if not header_path.exists():
-        return []
-    
-    try:
-        content = header_path.read_text(encoding='utf-8')
-    except Exception:
-        return []
+    content = _read_header(header_path)
     
     # Find struct definition
-    struct_pattern = rf'\bstruct\s+{re.escape(struct_name)}\b'
-    struct_match = re.search(struct_pattern, content)
+    struct_match = _struct_def_for(struct_name).search(content)
     if not struct_match:
         return []
     
@@ -272,101 +321,73 @@ def extract_struct_members(header_path: Path, struct_name: str) -> List[str]:
     methods = []
     start_pos = struct_match.end()
     # Find the matching closing brace
-    brace_count = 1
-    i = start_pos
-    while i < len(content) and brace_count > 0:
-        if content[i] == '{':
-            brace_count += 1
-        elif content[i] == '}':
-            brace_count -= 1
-        i += 1
-    
-    struct_body = content[start_pos:i-1]
+    struct_body = content[start_pos:match_braces(content, start_pos)]
     
     # Extract method-like declarations (functions, not just data members)
-    method_pattern = r'(\w+)\s*\([^)]*\)\s*(?:const\s*)?(?:=\s*0\s*)?[;{]'
-    for match in re.finditer(method_pattern, struct_body):
+    seen = set()
+    for match in _STRUCT_METHOD_RE.finditer(struct_body):
         method_name = match.group(1)
-        if method_name and method_name not in ['~', 'operator'] and method_name not in EXCLUDE_METHODS:
-            if method_name not in methods:
-                methods.append(method_name)
+        if method_name not in _TYPED_REJECTS and method_name not in seen:
+            seen.add(method_name)
+            methods.append(method_name)
     
     return methods
 
 
 def extract_all_public_methods(header_path: Path) -> List[str]:
     """Extract ALL public methods from a C++ header file (no filtering)"""
-    if not header_path.exists():
-        return []
-    
-    try:
-        content = header_path.read_text(encoding='utf-8')
-    except Exception:
-        return []
-    
-    methods = []
-    
-    # Remove comments and strings to avoid false matches
-    content_no_comments = re.sub(r'//.*?$', '', content, flags=re.MULTILINE)
-    content_no_comments = re.sub(r'/\*.*?\*/', '', content_no_comments, flags=re.DOTALL)
-    content_no_comments = re.sub(r'"[^"]*"', '""', content_no_comments)
-    content_no_comments = re.sub(r"'[^']*'", "''", content_no_comments)
+    return list(_public_methods_for(header_path))
+
+
+@functools.lru_cache(maxsize=None)
+def _public_methods_for(header_path: Path) -> tuple:
+    """Public methods of the first class in a header, parsed once per path"""
+    # Comments and strings are removed to avoid false matches
+    content_no_comments = _stripped_header(header_path)
     
     # Find class definition
-    class_match = re.search(r'\bclass\s+(\w+)\s*\{', content_no_comments)
+    class_match = _CLASS_DEF_RE.search(content_no_comments)
     if not class_match:
-        return []
+        return ()
     
     class_name = class_match.group(1)
     class_start = class_match.end()
     
     # Find the matching closing brace for the class
-    brace_count = 1
-    i = class_start
-    while i < len(content_no_comments) and brace_count > 0:
-        if content_no_comments[i] == '{':
-            brace_count += 1
-        elif content_no_comments[i] == '}':
-            brace_count -= 1
-        i += 1
-    
-    class_body = content_no_comments[class_start:i-1]
+    class_body = content_no_comments[class_start:match_braces(content_no_comments, class_start)]
     
     # Find all public: sections
     public_sections = []
-    for match in re.finditer(r'\bpublic\s*:', class_body):
+    for match in _PUBLIC_RE.finditer(class_body):
         public_start = match.end()
         # Find the next private: or protected: or end of class
-        next_private = re.search(r'\b(private|protected)\s*:', class_body[public_start:])
+        next_private = _PRIV_PROT_RE.search(class_body, public_start)
         if next_private:
-            public_end = public_start + next_private.start()
+            public_end = next_private.start()
         else:
             public_end = len(class_body)
         public_sections.append((public_start, public_end))
     
-    # Extract methods from all public sections
+    # Extract methods from each public section in one pass. Within a section, methods
+    # with an explicit return type are listed first, then the remaining untyped matches.
+    methods = []
+    seen = {class_name}  # Skip constructors
     for public_start, public_end in public_sections:
-        public_section = class_body[public_start:public_end]
-        
-        # Pattern 1: Match method with return type (bool, void, int, etc.)
-        # Handles: bool connectAudio(...); void setRegistry(...) { ... }
-        pattern_with_type = r'\b(bool|void|int|float|std::\w+(?:\s*<\s*[^>]+\s*>)?)\s+(\w+)\s*\([^)]*\)\s*(?:const\s*)?(?:override\s*)?(?:=\s*0\s*)?[;{]'
-        for match in re.finditer(pattern_with_type, public_section):
+        untyped = []
+        for match in _METHOD_ANY_RE.finditer(class_body, public_start, public_end):
             method_name = match.group(2)
-            if method_name and method_name not in ['~', 'operator'] and method_name not in EXCLUDE_METHODS:
-                if method_name != class_name:  # Skip constructors
-                    if method_name not in methods:
-                        methods.append(method_name)
+            if match.group('type') and method_name not in _TYPED_REJECTS and method_name not in seen:
+                seen.add(method_name)
+                methods.append(method_name)
+            else:
+                untyped.append(method_name)
         
-        # Pattern 2: Match method name directly (for cases without explicit return type)
-        pattern_direct = r'\b(\w+)\s*\([^)]*\)\s*(?:const\s*)?(?:override\s*)?(?:=\s*0\s*)?[;{]'
-        for match in re.finditer(pattern_direct, public_section):
-            method_name = match.group(1)
-            # Skip if already found by pattern 1, or if it's a keyword/operator
-            if method_name and method_name not in methods and method_name not in ['~', 'operator', 'bool', 'void', 'int', 'float', 'string', 'std', class_name] and method_name not in EXCLUDE_METHODS:
+        for method_name in untyped:
+            if method_name not in seen and method_name not in _KEYWORD_REJECTS:
+                seen.add(method_name)
                 methods.append(method_name)
     
-    return methods
+    return tuple(methods)
 
 
 def get_key_interaction_methods(class_name: str, all_methods: List[str]) -> List[str]:
@@ -380,19 +401,19 @@ def get_key_interaction_methods(class_name: str, all_methods: List[str]) -> List
     other_methods = []
     
     for method in all_methods:
-        method_lower = method.lower()
+        ml = method.lower()  # Lowercased once for every tier check
         
         # High priority: connection, registration, execution methods
-        if any(keyword in method_lower for keyword in ['connect', 'disconnect', 'register', 'execute', 'route', 'subscribe', 'unsubscribe']):
+        if _HIGH_PRIO_RE.search(ml):
             priority_methods.append(method)
         # Medium priority: getters/setters that return module references
-        elif method.startswith('get') and any(keyword in method_lower for keyword in ['module', 'manager', 'router', 'registry', 'factory', 'connection', 'state']):
+        elif method.startswith('get') and _GETTER_KIND_RE.search(ml):
             medium_priority.append(method)
         # Medium priority: subscription/notification methods
-        elif any(keyword in method_lower for keyword in ['notify', 'on', 'set']):
+        elif _NOTIFY_RE.search(ml):
             medium_priority.append(method)
         # Medium priority: load/save/serialize methods
-        elif any(keyword in method_lower for keyword in ['load', 'save', 'serialize', 'deserialize']):
+        elif _PERSIST_RE.search(ml):
             medium_priority.append(method)
         else:
             other_methods.append(method)
@@ -438,101 +459,163 @@ def format_node_text(class_name: str, methods: List[str], has_cpp: bool, descrip
     return "\n".join(lines)
 
 
+def load_node_cache() -> None:
+    """Load the on-disk node text cache into memory"""
+    global _node_cache
+    try:
+        with open(NODE_CACHE_PATH, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        _node_cache = data["nodes"] if data.get("version") == NODE_CACHE_VERSION else {}
+    except (OSError, ValueError, KeyError, AttributeError):
+        _node_cache = {}
+
+
+def save_node_cache() -> None:
+    """Write the in-memory node text cache back to disk"""
+    try:
+        NODE_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with open(NODE_CACHE_PATH, 'w', encoding='utf-8') as f:
+            json.dump({"version": NODE_CACHE_VERSION, "nodes": _node_cache}, f, ensure_ascii=False)
+    except OSError:
+        pass
+
+
+def source_mtimes(header_path: Path, cpp_path: Optional[Path]) -> Optional[List[int]]:
+    """[header mtime_ns, cpp mtime_ns or 0] identifying a class's sources (None if a stat fails)"""
+    try:
+        header_ns = header_path.stat().st_mtime_ns
+        cpp_ns = cpp_path.stat().st_mtime_ns if cpp_path else 0
+    except OSError:
+        return None
+    return [header_ns, cpp_ns]
+
+
+def _process_node(node: dict) -> NodeUpdate:
+    """Compute the new text for one canvas node without mutating it (thread-safe)"""
+    log = []
+    
+    # Extract class name from existing text
+    text = node.get("text", "").strip()
+    
+    # Try to extract class name
+    class_name = None
+    
+    # Pattern 1: "# ClassName.cpp/h" or "# ClassName.h"
+    match = _NODE_HDR_RE.search(text)
+    if match:
+        class_name = match.group(1)
+    else:
+        # Pattern 2: "*ClassName*" (abstract)
+        match = _ABSTRACT_RE.search(text)
+        if match:
+            class_name = match.group(1)
+        else:
+            # Pattern 3: Just the class name
+            lines = text.split('\n')
+            first_line = lines[0].strip()
+            class_name = first_line.replace(" (abstract)", "").replace(".h", "").replace(".cpp/h", "").replace(".cpp", "").replace("#", "").strip()
+    
+    if not class_name:
+        log.append(f"  Warning: Could not extract class name from node: {text[:50]}...")
+        return NodeUpdate(node, None, log, False, None)
+    
+    # Find header file
+    header_path = find_class_file(class_name)
+    cpp_path = find_cpp_file(class_name)
+    has_cpp = cpp_path is not None
+    fallback = get_fallback_description(class_name)
+    
+    if not header_path:
+        log.append(f"  ⚠️  {class_name}: Header file not found, using fallback description")
+        # Still update title with fallback description
+        new_text = format_node_text(class_name, [], False, fallback)
+        return NodeUpdate(node, new_text, log, True, None)
+    
+    # Extract methods - get all public methods first, then filter
+    log.append(f"  Processing {class_name}...")
+    
+    # Unchanged sources reuse the text formatted on a previous run
+    sources = source_mtimes(header_path, cpp_path)
+    entry = _node_cache.get(class_name)
+    if (sources and isinstance(entry, dict) and entry.get("sources") == sources
+            and isinstance(entry.get("text"), str)):
+        log.append(f"    ✓ Unchanged sources, using cached text")
+        return NodeUpdate(node, entry["text"], log, False, None)
+    
+    # Check if it's a struct (structs are in Module.h, MultiSampler.h, etc.)
+    is_struct = class_name in ["TriggerEvent", "Port", "SampleRef", "Voice"]
+    
+    if is_struct:
+        all_methods = extract_struct_members(header_path, class_name)
+    else:
+        all_methods = extract_all_public_methods(header_path)
+    
+    key_methods = get_key_interaction_methods(class_name, all_methods)
+    
+    # Extract class description (with fallback)
+    description = extract_class_description(header_path, class_name, fallback)
+    
+    # Format new text (without "Key Methods" title)
+    new_text = format_node_text(class_name, key_methods, has_cpp, description)
+    cache_entry = (class_name, {"sources": sources, "text": new_text}) if sources else None
+    
+    if key_methods:
+        log.append(f"    ✓ Found {len(all_methods)} methods, selected {len(key_methods)} key methods")
+    elif description:
+        log.append(f"    ✓ Added description: {description[:50]}...")
+    else:
+        log.append(f"    ⚠️  No methods or description found")
+    
+    return NodeUpdate(node, new_text, log, False, cache_entry)
+
+
 def update_all_nodes():
     """Update all canvas nodes with proper descriptions and methods"""
     print(f"Reading canvas: {CANVAS_PATH}")
     
     # Read existing canvas
-    with open(CANVAS_PATH, 'r', encoding='utf-8') as f:
-        canvas_data = json.load(f)
+    canvas_data = read_canvas(CANVAS_PATH)
+    load_node_cache()
+    cache_dirty = False
     
     nodes = canvas_data.get("nodes", [])
     print(f"Found {len(nodes)} nodes")
     
     updated_count = 0
     not_found_count = 0
+    dirty = False  # Set once any node text actually changes
     
-    for node in nodes:
-        if node.get("type") != "text":
-            continue
-        
-        # Extract class name from existing text
-        text = node.get("text", "").strip()
-        
-        # Try to extract class name
-        class_name = None
-        
-        # Pattern 1: "# ClassName.cpp/h" or "# ClassName.h"
-        match = re.search(r'#\s*(\w+)\.(?:cpp/)?h', text)
-        if match:
-            class_name = match.group(1)
-        else:
-            # Pattern 2: "*ClassName*" (abstract)
-            match = re.search(r'\*(\w+)\*', text)
-            if match:
-                class_name = match.group(1)
-            else:
-                # Pattern 3: Just the class name
-                lines = text.split('\n')
-                first_line = lines[0].strip()
-                class_name = first_line.replace(" (abstract)", "").replace(".h", "").replace(".cpp/h", "").replace(".cpp", "").replace("#", "").strip()
-        
-        if not class_name:
-            print(f"  Warning: Could not extract class name from node: {text[:50]}...")
-            continue
-        
-        # Find header file
-        header_path = find_class_file(class_name)
-        cpp_path = find_cpp_file(class_name)
-        has_cpp = cpp_path is not None
-        
-        if not header_path:
-            print(f"  ⚠️  {class_name}: Header file not found, using fallback description")
-            not_found_count += 1
-            # Use fallback description
-            description = get_fallback_description(class_name)
-            all_methods = []
-            key_methods = []
-            # Still update title with description
-            new_text = format_node_text(class_name, key_methods, False, description)
-            node["text"] = new_text
-            updated_count += 1
+    # Nodes are processed concurrently; results are applied and logged in canvas order
+    text_nodes = [node for node in nodes if node.get("type") == "text"]
+    with ThreadPoolExecutor(max_workers=NODE_WORKERS) as pool:
+        updates = list(pool.map(_process_node, text_nodes))
+    
+    for update in updates:
+        for line in update.log:
+            print(line)
+        if update.text is None:
             continue
         
-        # Extract methods - get all public methods first, then filter
-        print(f"  Processing {class_name}...")
-        
-        # Check if it's a struct (structs are in Module.h, MultiSampler.h, etc.)
-        is_struct = class_name in ["TriggerEvent", "Port", "SampleRef", "Voice"]
-        
-        if is_struct:
-            all_methods = extract_struct_members(header_path, class_name)
-        else:
-            all_methods = extract_all_public_methods(header_path)
-        
-        key_methods = get_key_interaction_methods(class_name, all_methods)
-        
-        # Extract class description (with fallback)
-        description = extract_class_description(header_path, class_name)
-        # Ensure we always have a description (fallback is built into extract_class_description, but double-check)
-        if not description:
-            description = get_fallback_description(class_name)
-        
-        # Format new text (without "Key Methods" title)
-        new_text = format_node_text(class_name, key_methods, has_cpp, description)
-        node["text"] = new_text
+        if update.node.get("text") != update.text:
+            update.node["text"] = update.text
+            dirty = True
         updated_count += 1
-        
-        if key_methods:
-            print(f"    ✓ Found {len(all_methods)} methods, selected {len(key_methods)} key methods")
-        elif description:
-            print(f"    ✓ Added description: {description[:50]}...")
-        else:
-            print(f"    ⚠️  No methods or description found")
+        if update.not_found:
+            not_found_count += 1
+        if update.cache_entry:
+            class_name, entry = update.cache_entry
+            _node_cache[class_name] = entry
+            cache_dirty = True
+    
+    if cache_dirty:
+        save_node_cache()
+    
+    if not dirty:
+        print("\nNo changes")
+        return
     
     # Write updated canvas
-    with open(CANVAS_PATH, 'w', encoding='utf-8') as f:
-        json.dump(canvas_data, f, indent="\t", ensure_ascii=False)
+    write_canvas(CANVAS_PATH, canvas_data)
     
     print(f"\n✅ Canvas updated successfully!")
     print(f"   Updated {updated_count} nodes")
@@ -541,4 +624,3 @@ def update_all_nodes():
 
 if __name__ == "__main__":
     update_all_nodes()
-
@@ -1,25 +1,33 @@
 #!/usr/bin/env python3
 """
-Update existing Obsidian canvas file with missing nodes and edges.
+Update existing Obsidian canvas file with missing nodes.
 
 This script:
 1. Reads the existing canvas file
 2. Identifies missing classes
 3. Adds missing nodes in appropriate positions
-4. Adds inheritance and relationship edges
+4. Removes all edges (no relationships are drawn on this canvas)
 5. Preserves existing format (styleAttributes, etc.)
 """
 
-import json
-import uuid
+import bisect
+import re
+import secrets
+import sys
+from collections import Counter, defaultdict
 from pathlib import Path
-from typing import Dict, List, Set, Optional
+from typing import Dict, List, Set, Tuple
+
+from canvas_common import encode_canvas, parse_canvas, write_canvas
+
+
+def _canvas_path() -> Path:
+    """Canvas file path (resolved on use, so importing the module never probes $HOME)"""
+    return Path.home() / "works" / "notes" / "Programming" / "videoTracker" / "videoTracker UML Diagram.canvas"
 
-# Canvas file path
-CANVAS_PATH = Path.home() / "works" / "notes" / "Programming" / "videoTracker" / "videoTracker UML Diagram.canvas"
 
 # All classes that should exist
-ALL_CLASSES = {
+ALL_CLASSES = frozenset({
     # Application
     "ofBaseApp", "ofApp",
     # Core Systems
@@ -47,52 +55,10 @@ ALL_CLASSES = {
     "Port", "TriggerEvent", "Envelope", "VoiceManager",
     # Utilities
     "AssetLibrary", "MediaConverter", "InputRouter", "ExpressionParser"
-}
-
-# Inheritance relationships
-INHERITANCE = {
-    "ofApp": "ofBaseApp",
-    "TrackerSequencer": "Module",
-    "MultiSampler": "Module",
-    "AudioMixer": "Module",
-    "VideoMixer": "Module",
-    "AudioOutput": "Module",
-    "VideoOutput": "Module",
-    "Oscilloscope": "Module",
-    "Spectrogram": "Module",
-    "TrackerSequencerGUI": "ModuleGUI",
-    "MultiSamplerGUI": "ModuleGUI",
-    "AudioMixerGUI": "ModuleGUI",
-    "VideoMixerGUI": "ModuleGUI",
-    "AudioOutputGUI": "ModuleGUI",
-    "VideoOutputGUI": "ModuleGUI",
-    "OscilloscopeGUI": "ModuleGUI",
-    "SpectrogramGUI": "ModuleGUI",
-    "NumCell": "BaseCell",
-    "BoolCell": "BaseCell",
-    "MenuCell": "BaseCell",
-}
+})
 
-# Composition relationships
-COMPOSITIONS = {
-    "ofApp": ["Clock", "ModuleFactory", "ModuleRegistry", "ConnectionManager", 
-              "ParameterRouter", "SessionManager", "ProjectManager", "GUIManager",
-              "ViewManager", "InputRouter", "AssetLibrary", "MediaConverter"],
-    "ConnectionManager": ["AudioRouter", "VideoRouter", "EventRouter"],
-    "MultiSampler": ["SampleRef", "Voice", "VoiceManager"],
-    "TrackerSequencer": ["Pattern", "PatternChain"],
-}
-
-# Association relationships
-ASSOCIATIONS = {
-    "ModuleRegistry": ["Module"],
-    "ModuleFactory": ["Module"],
-    "ConnectionManager": ["Module"],
-    "ParameterRouter": ["Module"],
-    "SessionManager": ["Module"],
-    "ModuleGUI": ["Module"],
-    "ParameterCell": ["Module", "BaseCell"],
-}
+# Classes rendered as abstract
+_ABSTRACT = frozenset({"Module", "ModuleGUI", "BaseCell", "ofBaseApp"})
 
 # Layer positions (matching existing layout)
 LAYER_POSITIONS = {
@@ -107,6 +73,31 @@ LAYER_POSITIONS = {
     "utilities": {"x": 4000, "y": -400},
 }
 
+# New-node placement per layer, from the layer position and the node count so far:
+# ("grid", columns, column width, row height), ("vstack", dy), ("hstack", dx), ("fixed",)
+_LAYOUT_RULES = {
+    "core": ("grid", 2, 340, 80),         # 2 columns, matching the existing pattern
+    "modules": ("grid", 2, 280, 80),
+    "gui_classes": ("grid", 2, 280, 80),
+    "application": ("vstack", -100),      # Go up (negative Y)
+    "module_base": ("fixed",),            # Near Module.h
+    "gui_base": ("fixed",),               # Near ModuleGUI.h
+    "cell_system": ("hstack", 300),       # Stack to the right
+    "data_structures": ("vstack", 100),
+    "utilities": ("vstack", 100),
+}
+_DEFAULT_LAYOUT = ("vstack", 100)
+# Height of a regular class node; a vstack step minus this is the gap kept between nodes
+_NODE_HEIGHT = 60
+_ORIGIN = {"x": 0, "y": 0}  # Base position for layers without an entry
+
+# Decorations stripped from node text to recover the class name
+_CLEAN_RE = re.compile(r" \(abstract\)|\.cpp/h|\.cpp|\.h")
+# Abstract class node text as written by create_missing_node ("*Name*\n(abstract)")
+_ABSTRACT_TEXT_RE = re.compile(r"\*(\w+)\*\n\(abstract\)")
+# Longest node text still considered a candidate class name
+_MAX_NAME_TEXT = 64
+
 # Class to layer mapping
 CLASS_TO_LAYER = {
     "ofBaseApp": "application", "ofApp": "application",
@@ -141,91 +132,98 @@ CLASS_TO_LAYER = {
 }
 
 
+def _clean(text: str) -> str:
+    """Class name from node text (remove "(abstract)", file extensions, etc.)"""
+    return _CLEAN_RE.sub("", text).strip()
+
+
 def get_existing_nodes(canvas_data: dict) -> Dict[str, dict]:
-    """Extract existing nodes by class name"""
+    """Extract existing nodes by class name (keys are already cleaned with _clean)"""
     existing = {}
     for node in canvas_data.get("nodes", []):
         if node.get("type") == "text":
             text = node.get("text", "").strip()
-            # Clean up text (remove "(abstract)", file extensions, etc.)
-            class_name = text.replace(" (abstract)", "").replace(".h", "").replace(".cpp/h", "").replace(".cpp", "").strip()
-            existing[class_name] = node
+            # Abstract nodes span two lines, so recognize them before the filter below
+            abstract = _ABSTRACT_TEXT_RE.fullmatch(text)
+            if abstract:
+                existing[abstract.group(1)] = node
+                continue
+            # Headings, multi-line notes and long markdown are never class nodes
+            if len(text) > _MAX_NAME_TEXT or "\n" in text or text.startswith("#"):
+                continue
+            existing[_clean(text)] = node
     return existing
 
 
 def generate_node_id() -> str:
     """Generate a node ID matching Obsidian format"""
-    return uuid.uuid4().hex[:16]
+    return secrets.token_hex(8)
+
 
+def _first_gap(spans: List[Tuple[int, int]], start: int, height: int, margin: int) -> int:
+    """Lowest y >= start where a node of height fits between spans (sorted (top, bottom))"""
+    y = start
+    for top, bottom in spans:
+        if bottom + margin <= y:
+            continue
+        if top >= y + height + margin:
+            break
+        y = max(y, bottom + margin)
+    return y
 
-def create_missing_node(class_name: str, layer: str, existing_nodes: Dict[str, dict]) -> Optional[dict]:
-    """Create a new node for a missing class"""
-    layer_pos = LAYER_POSITIONS.get(layer, {"x": 0, "y": 0})
+
+def _stack_y(spans: List[Tuple[int, int]], y_base: int, height: int, step: int) -> int:
+    """y for a stacked node: first free slot from y_base, going down (step > 0) or up"""
+    margin = abs(step) - _NODE_HEIGHT
+    if step > 0:
+        return _first_gap(spans, y_base, height, margin)
+    # Search upwards by mirroring the column around y = 0
+    mirrored = sorted((-bottom, -top) for top, bottom in spans)
+    return -_first_gap(mirrored, -y_base - height, height, margin) - height
+
+
+def create_missing_node(class_name: str, layer: str, layer_counts: Counter,
+                        layer_spans: Dict[str, List[Tuple[int, int]]]) -> dict:
+    """Create a new node for a missing class.
     
-    # Find position relative to existing nodes in same layer
-    existing_in_layer = [n for n in existing_nodes.values() 
-                        if CLASS_TO_LAYER.get(n.get("text", "").replace(" (abstract)", "").replace(".h", "").replace(".cpp/h", "").strip(), "") == layer]
+    layer_counts holds the number of nodes already placed in each layer and
+    layer_spans their sorted (top, bottom) y extents; both are updated with
+    the new node. Stacked layers fill the first vertical gap from the layer
+    base instead of growing past every node ever placed there.
+    """
+    layer_pos = LAYER_POSITIONS.get(layer) or _ORIGIN
     
     # Determine if abstract
-    is_abstract = class_name in ["Module", "ModuleGUI", "BaseCell", "ofBaseApp"]
+    is_abstract = class_name in _ABSTRACT
     
     # Calculate position based on existing layout
     x_base = layer_pos["x"]
     y_base = layer_pos["y"]
     
     # Count how many nodes already in this layer
-    count = len(existing_in_layer)
-    
-    # Get existing Y positions in this layer to avoid overlaps
-    existing_y_positions = sorted([n.get("y", 0) for n in existing_in_layer])
+    count = layer_counts[layer]
+    layer_counts[layer] = count + 1
+    spans = layer_spans[layer]
+    height = 200 if is_abstract else _NODE_HEIGHT
     
     # Position new node
-    if layer == "core":
-        # Grid layout (2 columns) - match existing pattern
-        col = count % 2
-        row = count // 2
-        x = x_base + col * 340
-        y = y_base + row * 80
-    elif layer == "modules":
-        # Grid layout (2 columns) - match existing pattern
-        col = count % 2
-        row = count // 2
-        x = x_base + col * 280
-        y = y_base + row * 80
-    elif layer == "gui_classes":
-        # Grid layout (2 columns) - match existing pattern
-        col = count % 2
-        row = count // 2
-        x = x_base + col * 280
-        y = y_base + row * 80
-    elif layer == "application":
-        # Stack vertically below existing
-        x = x_base
-        y = y_base - count * 100  # Go up (negative Y)
-    elif layer == "module_base":
-        # Position near Module.h
+    kind, *params = _LAYOUT_RULES.get(layer, _DEFAULT_LAYOUT)
+    if kind == "grid":
+        columns, col_width, row_height = params
+        row, col = divmod(count, columns)
+        x = x_base + col * col_width
+        y = y_base + row * row_height
+    elif kind == "vstack":
         x = x_base
+        y = _stack_y(spans, y_base, height, params[0])
+    elif kind == "hstack":
+        x = x_base + count * params[0]
         y = y_base
-    elif layer == "gui_base":
-        # Position near ModuleGUI.h
+    else:  # "fixed"
         x = x_base
         y = y_base
-    elif layer == "cell_system":
-        # Stack to the right
-        x = x_base + count * 300
-        y = y_base
-    elif layer == "data_structures":
-        # Stack vertically
-        x = x_base
-        y = y_base + count * 100
-    elif layer == "utilities":
-        # Stack vertically
-        x = x_base
-        y = y_base + count * 100
-    else:
-        # Default: vertical stack
-        x = x_base
-        y = y_base + count * 100
+    
+    bisect.insort(spans, (y, y + height))
     
     # Format text
     text = f"*{class_name}*\n(abstract)" if is_abstract else class_name
@@ -238,115 +236,47 @@ def create_missing_node(class_name: str, layer: str, existing_nodes: Dict[str, d
         "x": x,
         "y": y,
         "width": 300 if is_abstract else 260,
-        "height": 200 if is_abstract else 60
-    }
-
-
-def create_edges(existing_nodes: Dict[str, dict], canvas_data: dict) -> List[dict]:
-    """Create inheritance and relationship edges"""
-    edges = []
-    edge_id = 0
-    
-    # Helper to get node ID by class name
-    def get_node_id(class_name: str) -> Optional[str]:
-        for name, node in existing_nodes.items():
-            clean_name = name.replace(" (abstract)", "").replace(".h", "").replace(".cpp/h", "").replace(".cpp", "").strip()
-            if clean_name == class_name:
-                return node.get("id")
-        return None
-    
-    # Inheritance edges
-    for child, parent in INHERITANCE.items():
-        if parent:  # Skip if no parent
-            child_id = get_node_id(child)
-            parent_id = get_node_id(parent)
-            if child_id and parent_id:
-                edges.append({
-                    "id": f"edge-{edge_id}",
-                    "fromNode": child_id,
-                    "fromSide": "top",
-                    "toNode": parent_id,
-                    "toSide": "bottom",
-                    "color": "2"
-                })
-                edge_id += 1
-    
-    # Composition edges (only key relationships to avoid clutter)
-    key_compositions = {
-        "ofApp": ["ModuleRegistry", "ConnectionManager", "GUIManager"],
-        "ConnectionManager": ["AudioRouter", "VideoRouter", "EventRouter"],
+        "height": height
     }
-    
-    for from_class, to_classes in key_compositions.items():
-        from_id = get_node_id(from_class)
-        if from_id:
-            for to_class in to_classes:
-                to_id = get_node_id(to_class)
-                if to_id:
-                    edges.append({
-                        "id": f"edge-{edge_id}",
-                        "fromNode": from_id,
-                        "fromSide": "right",
-                        "toNode": to_id,
-                        "toSide": "left",
-                        "color": "3"
-                    })
-                    edge_id += 1
-    
-    # Key associations
-    key_associations = {
-        "ModuleRegistry": ["Module"],
-        "ModuleGUI": ["Module"],
-    }
-    
-    for from_class, to_classes in key_associations.items():
-        from_id = get_node_id(from_class)
-        if from_id:
-            for to_class in to_classes:
-                to_id = get_node_id(to_class)
-                if to_id and from_id != to_id:
-                    edges.append({
-                        "id": f"edge-{edge_id}",
-                        "fromNode": from_id,
-                        "fromSide": "right",
-                        "toNode": to_id,
-                        "toSide": "left",
-                        "color": "4"
-                    })
-                    edge_id += 1
-    
-    return edges
 
 
 def main():
-    """Update existing canvas with missing nodes and edges"""
-    print(f"Reading canvas: {CANVAS_PATH}")
+    """Update existing canvas with missing nodes"""
+    canvas_path = _canvas_path()
+    print(f"Reading canvas: {canvas_path}")
     
-    # Read existing canvas
-    with open(CANVAS_PATH, 'r', encoding='utf-8') as f:
-        canvas_data = json.load(f)
+    # Read existing canvas (raw bytes are kept to detect a no-op update)
+    original_payload = canvas_path.read_bytes()
+    canvas_data = parse_canvas(original_payload)
     
     # Get existing nodes
     existing_nodes = get_existing_nodes(canvas_data)
     print(f"Found {len(existing_nodes)} existing nodes")
     
     # Find missing classes
-    existing_class_names = set(existing_nodes.keys())
-    missing_classes = ALL_CLASSES - existing_class_names
+    missing_classes = ALL_CLASSES - existing_nodes.keys()
     
-    print(f"Missing classes: {len(missing_classes)}")
-    for cls in sorted(missing_classes):
-        print(f"  - {cls}")
+    sys.stdout.write(f"Missing classes: {len(missing_classes)}\n"
+                     + "".join(f"  - {cls}\n" for cls in sorted(missing_classes)))
     
-    # Add missing nodes
-    new_nodes = []
-    for class_name in missing_classes:
-        layer = CLASS_TO_LAYER.get(class_name, "utilities")
-        new_node = create_missing_node(class_name, layer, existing_nodes)
-        if new_node:
-            new_nodes.append(new_node)
-            existing_nodes[class_name] = new_node
-            print(f"Added: {class_name} at ({new_node['x']}, {new_node['y']})")
+    # Add missing nodes (layer occupancy collected once, then kept up to date;
+    # existing_nodes is not needed past this point, so it is left as read)
+    layer_of = CLASS_TO_LAYER.get  # Bound once for the loops below
+    layer_counts = Counter()
+    layer_spans = defaultdict(list)
+    for name, node in existing_nodes.items():
+        layer = layer_of(name, "")
+        layer_counts[layer] += 1
+        y = node.get("y", 0)
+        layer_spans[layer].append((y, y + node.get("height", _NODE_HEIGHT)))
+    for spans in layer_spans.values():
+        spans.sort()
+    added_classes = list(missing_classes)
+    new_nodes = [create_missing_node(c, layer_of(c, "utilities"), layer_counts, layer_spans)
+                 for c in added_classes]
+    if new_nodes:
+        sys.stdout.write("".join(f"Added: {c} at ({n['x']}, {n['y']})\n"
+                                 for c, n in zip(added_classes, new_nodes)))
     
     # Add new nodes to canvas
     canvas_data["nodes"].extend(new_nodes)
@@ -363,9 +293,14 @@ def main():
             "frontmatter": {}
         }
     
+    # Skip the write (and Obsidian's reload) when the serialized canvas is unchanged
+    new_payload = encode_canvas(canvas_data)
+    if new_payload == original_payload:
+        print("\nNo changes, canvas left untouched")
+        return
+    
     # Write updated canvas
-    with open(CANVAS_PATH, 'w', encoding='utf-8') as f:
-        json.dump(canvas_data, f, indent="\t", ensure_ascii=False)
+    write_canvas(canvas_path, canvas_data, payload=new_payload, atomic=True)
     
     print(f"\n✅ Canvas updated successfully!")
     print(f"   Total nodes: {len(canvas_data['nodes'])}")
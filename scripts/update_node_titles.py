@@ -8,10 +8,16 @@ This script:
 3. Adds key interaction methods to each node
 """
 
-import json
+import bisect
+import functools
+import os
 import re
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Set
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from canvas_common import NodeUpdate, dir_entries, exists, match_braces, read_canvas, search, write_canvas
 
 # Canvas file path
 CANVAS_PATH = Path.home() / "works" / "notes" / "Programming" / "videoTracker" / "videoTracker UML Diagram.canvas"
@@ -19,6 +25,17 @@ CANVAS_PATH = Path.home() / "works" / "notes" / "Programming" / "videoTracker" /
 # Source directory
 SRC_DIR = Path("/Users/jaufre/works/of_v0.12.1_osx_release/apps/myApps/videoTracker/src")
 
+# Worker threads for per-node header parsing
+NODE_WORKERS = min(8, os.cpu_count() or 4)
+
+# Everything node formatting needs from one header, gathered in a single read:
+# raw content, public methods of its classes, and its /** ... */ doc blocks
+# (with their end offsets, for finding the block closest before a definition).
+# methods stays one flat list for the whole header rather than a per-class dict:
+# a node lists every public method declared in its header, helper classes
+# included, and keying by class would drop those from the node text.
+HeaderInfo = namedtuple('HeaderInfo', 'content methods doc_blocks doc_ends')
+
 # Class name to file mapping (for classes that don't follow standard naming)
 CLASS_TO_FILE = {
     "ofApp": "ofApp",
@@ -31,14 +48,14 @@ CLASS_TO_FILE = {
 }
 
 # Methods that indicate interaction with other modules
-INTERACTION_KEYWORDS = {
+INTERACTION_KEYWORDS = frozenset({
     "get", "set", "connect", "disconnect", "register", "add", "remove",
     "create", "execute", "load", "save", "subscribe", "unsubscribe",
     "route", "process", "update", "notify", "find", "query"
-}
+})
 
 # Methods to exclude (too generic or internal)
-EXCLUDE_METHODS = {
+EXCLUDE_METHODS = frozenset({
     "getType", "getName", "getInstanceName", "setInstanceName",
     "toJson", "fromJson", "serialize", "deserialize",
     "setup", "update", "draw", "audioOut", "videoOut",
@@ -46,102 +63,194 @@ EXCLUDE_METHODS = {
     "getX", "getY", "setX", "setY", "getPosition", "setPosition",
     "getColor", "setColor", "isVisible", "setVisible",
     "getParent", "setParent", "getChildren", "addChild", "removeChild"
+})
+
+# Fallback class descriptions used when a header has no doc comment
+_FALLBACK_DESCRIPTIONS = {
+    "EngineState": "Immutable snapshot of engine state for rendering",
+    "Engine": "Central headless core managing modules and execution",
+    "ConnectionManager": "Unified connection management for audio/video/parameters",
+    "ModuleRegistry": "Centralized storage and lookup for module instances",
+    "ModuleFactory": "Factory for creating module instances",
+    "ParameterRouter": "Routes parameter changes between modules",
+    "SessionManager": "Manages saving and loading application sessions",
+    "ProjectManager": "Manages project files and assets",
+    "PatternRuntime": "Runtime system for pattern evaluation",
+    "ScriptManager": "Generates and manages Lua scripts from state",
+    "Clock": "Central timing system for audio/video synchronization",
+    "CommandExecutor": "Executes commands with undo/redo support",
+    "AudioRouter": "Routes audio signals between modules",
+    "VideoRouter": "Routes video signals between modules",
+    "EventRouter": "Manages event subscriptions between modules",
+    "AssetLibrary": "Manages media assets and references",
+    "MediaConverter": "Converts between media formats",
+    "InputRouter": "Routes input events to modules",
+    "ExpressionParser": "Parses mathematical expressions",
+    # Structs and data types
+    "TriggerEvent": "Event data for discrete step triggers with parameters",
+    "Port": "Describes an input or output port on a module for routing",
+    "SampleRef": "Contains shared audio data and video path for efficient memory usage",
+    "Voice": "Represents an active playback instance in MultiSampler",
+    "ofBaseApp": "Base class from openFrameworks framework (external dependency)",
 }
 
+# Precompiled patterns
+# Comments and string/char literals, matched left to right in one pass
+_STRIP_RE = re.compile(r'//[^\n]*|/\*.*?\*/|"[^"]*"|\'[^\']*\'', re.DOTALL)
+_CLASS_DECL_RE = re.compile(r'\bclass\s+(\w+)')
+_PUBLIC_RE = re.compile(r'\bpublic\s*:')
+_PRIV_PROT_RE = re.compile(r'\b(private|protected)\s*:')
+# Usual spellings of an access specifier at the start of a line
+_PUBLIC_PREFIXES = ('public:', 'public :')
+_PRIV_PROT_PREFIXES = ('private:', 'private :', 'protected:', 'protected :')
+_METHOD_RE = re.compile(r'\b(\w+)\s*\([^)]*\)\s*(?:const\s*)?(?:=\s*0\s*)?[;{]')
+_STRUCT_METHOD_RE = re.compile(r'(\w+)\s*\([^)]*\)\s*(?:const\s*)?(?:=\s*0\s*)?[;{]')
+_DOC_BLOCK_RE = re.compile(r'/\*\*\s*(.*?)\s*\*/', re.DOTALL)
+_STAR_SPACE_RE = re.compile(r'\*\s*')
+_WS_RE = re.compile(r'\s+')
+_NODE_HDR_RE = re.compile(r'#\s*(\w+)\.(?:cpp/)?h')
+_ABSTRACT_RE = re.compile(r'\*(\w+)\*')
 
-def find_class_file(class_name: str) -> Optional[Path]:
-    """Find the header file for a class"""
-    # Check explicit mapping first
-    if class_name in CLASS_TO_FILE:
-        base_name = CLASS_TO_FILE[class_name]
+# Any interaction keyword inside a lowercased method name
+_INTERACTION_RE = re.compile('|'.join(sorted(map(re.escape, INTERACTION_KEYWORDS))))
+
+# Method-name priority tiers (matched against the lowercased name)
+_HIGH_PRIO_RE = re.compile(r'connect|disconnect|register|execute|route|subscribe|unsubscribe')
+_GETTER_KIND_RE = re.compile(r'module|manager|router|registry|factory|connection|state')
+_NOTIFY_RE = re.compile(r'notify|on|set')
+_PERSIST_RE = re.compile(r'load|save|serialize|deserialize')
+
+
+@functools.lru_cache(maxsize=None)
+def _class_def_for(name: str, word_start: bool = True) -> re.Pattern:
+    """Pattern for a class/struct definition of `name` (optionally without a leading word boundary)"""
+    if word_start:
+        return re.compile(rf'\b(class|struct)\s+{re.escape(name)}\b')
+    return re.compile(rf'(struct|class)\s+{re.escape(name)}\b')
+
+
+@functools.lru_cache(maxsize=None)
+def _struct_def_for(name: str) -> re.Pattern:
+    """Pattern for a struct definition of `name`"""
+    return re.compile(rf'\bstruct\s+{re.escape(name)}\b')
+
+
+@functools.lru_cache(maxsize=None)
+def _explicit_files() -> Tuple[Dict[str, Path], Dict[str, Path]]:
+    """(headers, cpps) for the CLASS_TO_FILE entries, resolved once and kept only if they exist"""
+    headers = {}
+    cpps = {}
+    for class_name, base_name in CLASS_TO_FILE.items():
         # Handle paths with subdirectories (e.g., "modules/Module")
         if "/" in base_name:
-            path = SRC_DIR / f"{base_name}.h"
-            if path.exists():
-                return path
+            header = SRC_DIR / f"{base_name}.h"
+            header = header if exists(header) else None
         else:
-            for ext in [".h", ".hpp"]:
-                path = SRC_DIR / f"{base_name}{ext}"
-                if path.exists():
-                    return path
-            # Try subdirectories
-            for subdir in ["core", "modules", "gui", "utils", "data", "input", "shell"]:
-                path = SRC_DIR / subdir / f"{base_name}{ext}"
-                if path.exists():
-                    return path
-    
-    # Standard search: try exact match first
-    for ext in [".h", ".hpp"]:
-        path = SRC_DIR / f"{class_name}{ext}"
-        if path.exists():
-            return path
-    
-    # Search in subdirectories
-    for subdir in ["core", "modules", "gui", "utils", "data", "input", "shell"]:
-        for ext in [".h", ".hpp"]:
-            path = SRC_DIR / subdir / f"{class_name}{ext}"
-            if path.exists():
-                return path
-    
-    # Try with different naming conventions
-    # Convert CamelCase to snake_case or lowercase
-    variants = [
-        class_name,
-        class_name.lower(),
-        class_name[0].lower() + class_name[1:] if class_name else "",
-    ]
-    
-    for variant in variants:
-        for subdir in ["core", "modules", "gui", "utils", "data", "input", "shell"]:
-            for ext in [".h", ".hpp"]:
-                path = SRC_DIR / subdir / f"{variant}{ext}"
-                if path.exists():
-                    return path
-    
-    return None
+            header = search(SRC_DIR, base_name, (".h", ".hpp"))
+        if header:
+            headers[class_name] = header
+        cpp = search(SRC_DIR, base_name, (".cpp",))
+        if cpp:
+            cpps[class_name] = cpp
+    return headers, cpps
 
 
-def find_cpp_file(class_name: str) -> Optional[Path]:
-    """Find the cpp file for a class (if exists)"""
-    # Check explicit mapping first
-    if class_name in CLASS_TO_FILE:
-        base_name = CLASS_TO_FILE[class_name]
-        path = SRC_DIR / f"{base_name}.cpp"
-        if path.exists():
-            return path
-        # Try subdirectories
-        for subdir in ["core", "modules", "gui", "utils", "data", "input", "shell"]:
-            path = SRC_DIR / subdir / f"{base_name}.cpp"
-            if path.exists():
-                return path
-    
-    # Standard search
-    path = SRC_DIR / f"{class_name}.cpp"
-    if path.exists():
+def _reset_index() -> None:
+    """Forget cached directory listings, lookups and header parses (e.g. after changing SRC_DIR)"""
+    dir_entries.cache_clear()
+    _explicit_files.cache_clear()
+    _read_header.cache_clear()
+    _stripped_header.cache_clear()
+    parse_header.cache_clear()
+    find_class_file.cache_clear()
+    find_cpp_file.cache_clear()
+
+
+@functools.lru_cache(maxsize=None)
+def find_class_file(class_name: str) -> Optional[Path]:
+    """Find the header file for a class"""
+    # Check explicit mapping first, then the standard search for an exact match
+    path = _explicit_files()[0].get(class_name) or search(SRC_DIR, class_name, (".h", ".hpp"))
+    if path:
         return path
     
-    # Search in subdirectories
-    for subdir in ["core", "modules", "gui", "utils", "data", "input", "shell"]:
-        path = SRC_DIR / subdir / f"{class_name}.cpp"
-        if path.exists():
+    # Try with different naming conventions (subdirectories only)
+    for variant in (class_name.lower(), class_name[0].lower() + class_name[1:] if class_name else ""):
+        path = search(SRC_DIR, variant, (".h", ".hpp"), top_level=False)
+        if path:
             return path
     
     return None
 
 
+@functools.lru_cache(maxsize=None)
+def find_cpp_file(class_name: str) -> Optional[Path]:
+    """Find the cpp file for a class (if exists)"""
+    # Check explicit mapping first, then the standard search
+    return _explicit_files()[1].get(class_name) or search(SRC_DIR, class_name, (".cpp",))
+
+
+@functools.lru_cache(maxsize=None)
+def _read_header(path: Path) -> str:
+    """Header source, read once per path (read errors propagate and are not cached).
+    
+    Read as bytes and decoded in one step; invalid UTF-8 is replaced rather than
+    failing the whole header, and line endings are normalized as text mode would.
+    """
+    content = path.read_bytes().decode('utf-8', errors='replace')
+    if '\r' in content:
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+    return content
+
+
+@functools.lru_cache(maxsize=None)
+def _stripped_header(path: Path) -> str:
+    """Header source with comments removed and string/char literals emptied"""
+    return _STRIP_RE.sub(_strip_token, _read_header(path))
+
+
+def _strip_token(match: re.Match) -> str:
+    """Replacement for a _STRIP_RE match: literals keep their empty quotes, comments vanish"""
+    first = match.group(0)[0]
+    if first == '"':
+        return '""'
+    if first == "'":
+        return "''"
+    return ''
+
+
+def _iter_lines(s: str) -> Iterator[str]:
+    """Lines of s, exactly as s.split('\\n') would give them, without building the list"""
+    start = 0
+    while True:
+        end = s.find('\n', start)
+        if end == -1:
+            yield s[start:]
+            return
+        yield s[start:end]
+        start = end + 1
+
+
+@functools.lru_cache(maxsize=None)
+def parse_header(header_path: Path) -> HeaderInfo:
+    """Read and scan a header once for methods and doc blocks (read errors propagate)"""
+    content = _read_header(header_path)
+    doc_blocks = tuple(_DOC_BLOCK_RE.finditer(content))
+    return HeaderInfo(content, _public_methods_in(_stripped_header(header_path)),
+                      doc_blocks, [m.end() for m in doc_blocks])
+
+
 def extract_struct_members(header_path: Path, struct_name: str) -> List[str]:
     """Extract public members/methods from a struct definition"""
-    if not header_path.exists():
-        return []
-    
     try:
-        content = header_path.read_text(encoding='utf-8')
+        content = parse_header(header_path).content
     except Exception:
         return []
     
-    # Find struct definition
-    struct_pattern = rf'\bstruct\s+{re.escape(struct_name)}\b'
-    struct_match = re.search(struct_pattern, content)
+    # Find struct definition (cheap substring test first: most headers don't mention it)
+    if struct_name not in content:
+        return []
+    struct_match = _struct_def_for(struct_name).search(content)
     if not struct_match:
         return []
     
@@ -149,21 +258,11 @@ def extract_struct_members(header_path: Path, struct_name: str) -> List[str]:
     methods = []
     start_pos = struct_match.end()
     # Find the matching closing brace
-    brace_count = 1
-    i = start_pos
-    while i < len(content) and brace_count > 0:
-        if content[i] == '{':
-            brace_count += 1
-        elif content[i] == '}':
-            brace_count -= 1
-        i += 1
-    
-    struct_body = content[start_pos:i-1]
+    struct_body = content[start_pos:match_braces(content, start_pos)]
     
     # Extract method-like declarations (functions, not just data members)
     # Look for patterns like: returnType methodName(params);
-    method_pattern = r'(\w+)\s*\([^)]*\)\s*(?:const\s*)?(?:=\s*0\s*)?[;{]'
-    for match in re.finditer(method_pattern, struct_body):
+    for match in _STRUCT_METHOD_RE.finditer(struct_body):
         method_name = match.group(1)
         if method_name and method_name not in ['~', 'operator'] and method_name not in EXCLUDE_METHODS:
             if method_name not in methods:
@@ -172,33 +271,39 @@ def extract_struct_members(header_path: Path, struct_name: str) -> List[str]:
     return methods
 
 
-def extract_all_public_methods(header_path: Path) -> List[str]:
-    """Extract ALL public methods from a C++ header file (no filtering)"""
-    if not header_path.exists():
-        return []
+def extract_all_public_methods(header_path: Path, log: Optional[List[str]] = None) -> List[str]:
+    """Extract ALL public methods from a C++ header file (no filtering).
     
+    A read warning is appended to log when given, otherwise printed.
+    """
     try:
-        content = header_path.read_text(encoding='utf-8')
+        return list(parse_header(header_path).methods)
+    except FileNotFoundError:
+        return []
     except Exception as e:
-        print(f"  Warning: Could not read {header_path}: {e}")
+        warning = f"  Warning: Could not read {header_path}: {e}"
+        if log is None:
+            print(warning)
+        else:
+            log.append(warning)
         return []
-    
+
+
+def _public_methods_in(content_no_comments: str) -> tuple:
+    """Public methods of every class in stripped header source"""
     methods = []
     in_public_section = False
     in_class = False
     brace_depth = 0
+    current_class_name = None  # Name from the nearest "class X" line so far (for constructors)
     
-    # Remove comments and strings to avoid false matches
-    content_no_comments = re.sub(r'//.*?$', '', content, flags=re.MULTILINE)
-    content_no_comments = re.sub(r'/\*.*?\*/', '', content_no_comments, flags=re.DOTALL)
-    content_no_comments = re.sub(r'"[^"]*"', '""', content_no_comments)
-    content_no_comments = re.sub(r"'[^']*'", "''", content_no_comments)
-    
-    lines = content_no_comments.split('\n')
-    
-    for i, line in enumerate(lines):
+    # Comments and strings were removed to avoid false matches
+    for line in _iter_lines(content_no_comments):
         # Detect class start
-        if re.search(r'\bclass\s+\w+', line) and '{' in line:
+        class_match = _CLASS_DECL_RE.search(line)
+        if class_match:
+            current_class_name = class_match.group(1)
+        if class_match and '{' in line:
             in_class = True
             in_public_section = False
             brace_depth = line.count('{') - line.count('}')
@@ -214,61 +319,48 @@ def extract_all_public_methods(header_path: Path) -> List[str]:
             in_class = False
             continue
         
-        # Detect public: section
-        if re.search(r'\bpublic\s*:', line):
+        # Detect public: section (plain specifier lines skip the regex; it only runs
+        # when the keyword appears somewhere else in the line)
+        stripped = line.lstrip()
+        if stripped.startswith(_PUBLIC_PREFIXES) or ('public' in line and _PUBLIC_RE.search(line)):
             in_public_section = True
             continue
         
         # Detect private: or protected: sections
-        if re.search(r'\b(private|protected)\s*:', line):
+        if stripped.startswith(_PRIV_PROT_PREFIXES) or (
+                ('private' in line or 'protected' in line) and _PRIV_PROT_RE.search(line)):
             in_public_section = False
             continue
         
         # Extract method declarations in public section
         if in_public_section:
-            # Match method declarations - more flexible pattern
-            method_patterns = [
-                r'(\w+(?:\s*::\s*\w+)*(?:\s*[*&<>,\s])*)\s+(\w+)\s*\([^)]*\)\s*(?:const\s*)?(?:=\s*0\s*)?;',
-                r'(\w+(?:\s*::\s*\w+)*(?:\s*[*&<>,\s])*)\s+(\w+)\s*\([^)]*\)\s*(?:const\s*)?\s*\{',
-                r'(std::\w+(?:\s*<\s*[^>]+\s*>)?(?:\s*[*&])?)\s+(\w+)\s*\([^)]*\)\s*(?:const\s*)?(?:=\s*0\s*)?;',
-                r'(std::\w+(?:\s*<\s*[^>]+\s*>)?(?:\s*[*&])?)\s+(\w+)\s*\([^)]*\)\s*(?:const\s*)?\s*\{',
-                r'(void)\s+(\w+)\s*\([^)]*\)\s*(?:const\s*)?(?:=\s*0\s*)?;',
-                r'(void)\s+(\w+)\s*\([^)]*\)\s*(?:const\s*)?\s*\{',
-            ]
-            
+            # Every method pattern needs "(" and a closing ";" or "{" (cheap test before any regex)
+            if '(' not in line or (';' not in line and '{' not in line):
+                continue
             # Simplified pattern: match method name followed by (
             # This catches: bool connectAudio(...); void setRegistry(...) { ... }
-            method_match = re.search(r'\b(\w+)\s*\([^)]*\)\s*(?:const\s*)?(?:=\s*0\s*)?[;{]', line)
+            method_match = _METHOD_RE.search(line)
             if method_match:
                 method_name = method_match.group(1)
                 # Skip constructors, destructors, operators
                 if method_name and method_name not in ['~', 'operator'] and method_name not in EXCLUDE_METHODS:
-                    # Get class name to skip constructors
-                    class_name_match = None
-                    for j in range(i, -1, -1):
-                        class_match = re.search(r'\bclass\s+(\w+)', lines[j])
-                        if class_match:
-                            class_name_match = class_match.group(1)
-                            break
-                    
                     # Skip if it's a constructor (same as class name)
-                    if class_name_match and method_name == class_name_match:
+                    if method_name == current_class_name:
                         continue
                     
                     # Include all other methods
                     if method_name not in methods:  # Avoid duplicates
                         methods.append(method_name)
     
-    return methods
+    return tuple(methods)
 
 
 def extract_public_methods(header_path: Path) -> List[str]:
     """Extract public methods from a C++ header file"""
-    if not header_path.exists():
-        return []
-    
     try:
-        content = header_path.read_text(encoding='utf-8')
+        content_no_comments = _stripped_header(header_path)
+    except FileNotFoundError:
+        return []
     except Exception as e:
         print(f"  Warning: Could not read {header_path}: {e}")
         return []
@@ -277,18 +369,13 @@ def extract_public_methods(header_path: Path) -> List[str]:
     in_public_section = False
     in_class = False
     brace_depth = 0
+    class_name = None  # Class being scanned (its constructors are skipped)
     
-    # Remove comments and strings to avoid false matches
-    content_no_comments = re.sub(r'//.*?$', '', content, flags=re.MULTILINE)
-    content_no_comments = re.sub(r'/\*.*?\*/', '', content_no_comments, flags=re.DOTALL)
-    content_no_comments = re.sub(r'"[^"]*"', '""', content_no_comments)
-    content_no_comments = re.sub(r"'[^']*'", "''", content_no_comments)
-    
-    lines = content_no_comments.split('\n')
-    
-    for i, line in enumerate(lines):
+    for line in _iter_lines(content_no_comments):
         # Detect class start
-        if re.search(r'\bclass\s+\w+', line) and '{' in line:
+        class_match = _CLASS_DECL_RE.search(line)
+        if class_match and '{' in line:
+            class_name = class_match.group(1)
             in_class = True
             in_public_section = False
             brace_depth = line.count('{') - line.count('}')
@@ -304,46 +391,35 @@ def extract_public_methods(header_path: Path) -> List[str]:
             in_class = False
             continue
         
-        # Detect public: section
-        if re.search(r'\bpublic\s*:', line):
+        # Detect public: section (plain specifier lines skip the regex; it only runs
+        # when the keyword appears somewhere else in the line)
+        stripped = line.lstrip()
+        if stripped.startswith(_PUBLIC_PREFIXES) or ('public' in line and _PUBLIC_RE.search(line)):
             in_public_section = True
             continue
         
         # Detect private: or protected: sections
-        if re.search(r'\b(private|protected)\s*:', line):
+        if stripped.startswith(_PRIV_PROT_PREFIXES) or (
+                ('private' in line or 'protected' in line) and _PRIV_PROT_RE.search(line)):
             in_public_section = False
             continue
         
         # Extract method declarations in public section
         if in_public_section:
-            # Match method declarations - more flexible pattern
-            # Handles: return_type methodName(params) [const] [{] [= 0] [;]
-            # Also handles inline methods with {}
-            method_patterns = [
-                # Standard method: type name(params);
-                r'(\w+(?:\s*::\s*\w+)*(?:\s*[*&<>,\s])*)\s+(\w+)\s*\([^)]*\)\s*(?:const\s*)?(?:=\s*0\s*)?;',
-                # Inline method: type name(params) { ... }
-                r'(\w+(?:\s*::\s*\w+)*(?:\s*[*&<>,\s])*)\s+(\w+)\s*\([^)]*\)\s*(?:const\s*)?\s*\{',
-                # Return type with template: std::vector<...> name(params);
-                r'(std::\w+(?:\s*<\s*[^>]+\s*>)?(?:\s*[*&])?)\s+(\w+)\s*\([^)]*\)\s*(?:const\s*)?(?:=\s*0\s*)?;',
-                r'(std::\w+(?:\s*<\s*[^>]+\s*>)?(?:\s*[*&])?)\s+(\w+)\s*\([^)]*\)\s*(?:const\s*)?\s*\{',
-                # void name(params);
-                r'(void)\s+(\w+)\s*\([^)]*\)\s*(?:const\s*)?(?:=\s*0\s*)?;',
-                r'(void)\s+(\w+)\s*\([^)]*\)\s*(?:const\s*)?\s*\{',
-            ]
-            
-            for pattern in method_patterns:
-                method_match = re.search(pattern, line)
-                if method_match:
-                    method_name = method_match.group(2) if len(method_match.groups()) >= 2 else method_match.group(1)
-                    # Skip constructors, destructors, operators
-                    if method_name and method_name not in ['~', 'operator', 'ConnectionManager']:
-                        # Filter by interaction keywords
-                        if any(keyword in method_name.lower() for keyword in INTERACTION_KEYWORDS):
-                            if method_name not in EXCLUDE_METHODS:
-                                if method_name not in methods:  # Avoid duplicates
-                                    methods.append(method_name)
-                    break
+            # Every method pattern needs "(" and a closing ";" or "{" (cheap test before any regex)
+            if '(' not in line or (';' not in line and '{' not in line):
+                continue
+            # Same scanner as extract_all_public_methods: method name followed by (
+            method_match = _METHOD_RE.search(line)
+            if method_match:
+                method_name = method_match.group(1)
+                # Skip constructors, destructors, operators
+                if method_name not in ['~', 'operator'] and method_name != class_name:
+                    # Filter by interaction keywords
+                    if _INTERACTION_RE.search(method_name.lower()):
+                        if method_name not in EXCLUDE_METHODS:
+                            if method_name not in methods:  # Avoid duplicates
+                                methods.append(method_name)
     
     return methods
 
@@ -359,19 +435,19 @@ def get_key_interaction_methods(class_name: str, all_methods: List[str]) -> List
     other_methods = []
     
     for method in all_methods:
-        method_lower = method.lower()
+        ml = method.lower()  # Lowercased once for every tier check
         
         # High priority: connection, registration, execution methods
-        if any(keyword in method_lower for keyword in ['connect', 'disconnect', 'register', 'execute', 'route', 'subscribe', 'unsubscribe']):
+        if _HIGH_PRIO_RE.search(ml):
             priority_methods.append(method)
         # Medium priority: getters/setters that return module references
-        elif method.startswith('get') and any(keyword in method_lower for keyword in ['module', 'manager', 'router', 'registry', 'factory', 'connection', 'state']):
+        elif method.startswith('get') and _GETTER_KIND_RE.search(ml):
             medium_priority.append(method)
         # Medium priority: subscription/notification methods
-        elif any(keyword in method_lower for keyword in ['notify', 'on', 'set']):
+        elif _NOTIFY_RE.search(ml):
             medium_priority.append(method)
         # Medium priority: load/save/serialize methods
-        elif any(keyword in method_lower for keyword in ['load', 'save', 'serialize', 'deserialize']):
+        elif _PERSIST_RE.search(ml):
             medium_priority.append(method)
         else:
             other_methods.append(method)
@@ -392,67 +468,38 @@ def get_key_interaction_methods(class_name: str, all_methods: List[str]) -> List
 
 def get_fallback_description(class_name: str) -> str:
     """Generate a fallback description based on class name patterns"""
-    fallbacks = {
-        "EngineState": "Immutable snapshot of engine state for rendering",
-        "Engine": "Central headless core managing modules and execution",
-        "ConnectionManager": "Unified connection management for audio/video/parameters",
-        "ModuleRegistry": "Centralized storage and lookup for module instances",
-        "ModuleFactory": "Factory for creating module instances",
-        "ParameterRouter": "Routes parameter changes between modules",
-        "SessionManager": "Manages saving and loading application sessions",
-        "ProjectManager": "Manages project files and assets",
-        "PatternRuntime": "Runtime system for pattern evaluation",
-        "ScriptManager": "Generates and manages Lua scripts from state",
-        "Clock": "Central timing system for audio/video synchronization",
-        "CommandExecutor": "Executes commands with undo/redo support",
-        "AudioRouter": "Routes audio signals between modules",
-        "VideoRouter": "Routes video signals between modules",
-        "EventRouter": "Manages event subscriptions between modules",
-        "AssetLibrary": "Manages media assets and references",
-        "MediaConverter": "Converts between media formats",
-        "InputRouter": "Routes input events to modules",
-        "ExpressionParser": "Parses mathematical expressions",
-        # Structs and data types
-        "TriggerEvent": "Event data for discrete step triggers with parameters",
-        "Port": "Describes an input or output port on a module for routing",
-        "SampleRef": "Contains shared audio data and video path for efficient memory usage",
-        "Voice": "Represents an active playback instance in MultiSampler",
-        "ofBaseApp": "Base class from openFrameworks framework (external dependency)",
-    }
-    return fallbacks.get(class_name, "")
+    return _FALLBACK_DESCRIPTIONS.get(class_name, "")
 
 
 def extract_class_description(header_path: Path, class_name: str) -> str:
     """Extract class description from header file comments"""
-    if not header_path.exists():
-        return get_fallback_description(class_name)
-    
     try:
-        content = header_path.read_text(encoding='utf-8')
+        info = parse_header(header_path)
     except Exception:
         return get_fallback_description(class_name)
     
-    # Find the class or struct definition
-    class_pattern = rf'\b(class|struct)\s+{re.escape(class_name)}\b'
-    class_match = re.search(class_pattern, content)
+    content = info.content
+    
+    # Find the class or struct definition (both patterns need the literal name)
+    if class_name not in content:
+        return get_fallback_description(class_name)
+    class_match = _class_def_for(class_name).search(content)
     if not class_match:
         # For structs, also try without word boundary (might be in a comment or typedef)
-        class_pattern = rf'(struct|class)\s+{re.escape(class_name)}\b'
-        class_match = re.search(class_pattern, content)
+        class_match = _class_def_for(class_name, word_start=False).search(content)
         if not class_match:
             return get_fallback_description(class_name)
     
     # Look backwards from class definition for documentation comment
     start_pos = class_match.start()
-    before_class = content[:start_pos]
     
-    # Find the last /** ... */ comment block before the class
-    # Match /** ... */ blocks (multiline)
-    doc_blocks = list(re.finditer(r'/\*\*\s*(.*?)\s*\*/', before_class, re.DOTALL))
+    # Find the last /** ... */ comment block ending before the class (blocks of the
+    # whole header ending by start_pos are exactly those a scan of content[:start_pos] finds)
+    n_before = bisect.bisect_right(info.doc_ends, start_pos)
     
-    if doc_blocks:
+    if n_before:
         # Get the last comment block before the class
-        last_block = doc_blocks[-1]
+        last_block = info.doc_blocks[n_before - 1]
         doc_text = last_block.group(1)
         
         # Extract first meaningful line (usually the class description)
@@ -470,8 +517,8 @@ def extract_class_description(header_path: Path, class_name: str) -> str:
                 desc = first_line
             
             # Clean up: remove asterisks, extra spaces
-            desc = re.sub(r'\*\s*', '', desc)
-            desc = re.sub(r'\s+', ' ', desc).strip()
+            desc = _STAR_SPACE_RE.sub('', desc)
+            desc = _WS_RE.sub(' ', desc).strip()
             
             # Limit length
             if len(desc) > 120:
@@ -515,100 +562,114 @@ def format_node_text(class_name: str, methods: List[str], has_cpp: bool, descrip
     return "\n".join(lines)
 
 
+def _process_node(node: dict) -> NodeUpdate:
+    """Compute the new text for one canvas node without mutating it (thread-safe)"""
+    log = []
+    
+    # Extract class name from existing text
+    text = node.get("text", "").strip()
+    
+    # Try to extract class name (remove markdown, abstract markers, etc.)
+    class_name = None
+    
+    # Pattern 1: "# ClassName.cpp/h" or "# ClassName.h"
+    match = _NODE_HDR_RE.search(text)
+    if match:
+        class_name = match.group(1)
+    else:
+        # Pattern 2: "*ClassName*" (abstract)
+        match = _ABSTRACT_RE.search(text)
+        if match:
+            class_name = match.group(1)
+        else:
+            # Pattern 3: Just the class name
+            lines = text.split('\n')
+            first_line = lines[0].strip()
+            # Remove common prefixes/suffixes
+            class_name = first_line.replace(" (abstract)", "").replace(".h", "").replace(".cpp/h", "").replace(".cpp", "").strip()
+    
+    if not class_name:
+        log.append(f"  Warning: Could not extract class name from node: {text[:50]}...")
+        return NodeUpdate(node, None, log, False)
+    
+    # Find header file
+    header_path = find_class_file(class_name)
+    cpp_path = find_cpp_file(class_name)
+    has_cpp = cpp_path is not None
+    
+    if not header_path:
+        log.append(f"  ⚠️  {class_name}: Header file not found, using fallback description")
+        # Still update title with fallback description
+        new_text = format_node_text(class_name, [], False, get_fallback_description(class_name))
+        return NodeUpdate(node, new_text, log, True)
+    
+    # Extract methods - get all public methods first, then filter
+    log.append(f"  Processing {class_name}...")
+    
+    # Check if it's a struct (structs are in Module.h, MultiSampler.h, etc.)
+    is_struct = class_name in ["TriggerEvent", "Port", "SampleRef", "Voice"]
+    
+    if is_struct:
+        all_methods = extract_struct_members(header_path, class_name)
+    else:
+        all_methods = extract_all_public_methods(header_path, log)
+    
+    key_methods = get_key_interaction_methods(class_name, all_methods)
+    
+    # Extract class description
+    description = extract_class_description(header_path, class_name)
+    
+    # Format new text
+    new_text = format_node_text(class_name, key_methods, has_cpp, description)
+    
+    if key_methods:
+        log.append(f"    ✓ Found {len(all_methods)} methods, selected {len(key_methods)} key methods")
+    elif description:
+        log.append(f"    ✓ Added description: {description[:50]}...")
+    else:
+        log.append(f"    ⚠️  No methods or description found")
+    
+    return NodeUpdate(node, new_text, log, False)
+
+
 def main():
     """Update canvas nodes with proper titles and methods"""
     print(f"Reading canvas: {CANVAS_PATH}")
     
     # Read existing canvas
-    with open(CANVAS_PATH, 'r', encoding='utf-8') as f:
-        canvas_data = json.load(f)
+    canvas_data = read_canvas(CANVAS_PATH)
     
     nodes = canvas_data.get("nodes", [])
     print(f"Found {len(nodes)} nodes")
     
     updated_count = 0
     not_found_count = 0
+    dirty = False  # Set once any node text actually changes
     
-    for node in nodes:
-        if node.get("type") != "text":
-            continue
-        
-        # Extract class name from existing text
-        text = node.get("text", "").strip()
-        
-        # Try to extract class name (remove markdown, abstract markers, etc.)
-        class_name = None
-        
-        # Pattern 1: "# ClassName.cpp/h" or "# ClassName.h"
-        match = re.search(r'#\s*(\w+)\.(?:cpp/)?h', text)
-        if match:
-            class_name = match.group(1)
-        else:
-            # Pattern 2: "*ClassName*" (abstract)
-            match = re.search(r'\*(\w+)\*', text)
-            if match:
-                class_name = match.group(1)
-            else:
-                # Pattern 3: Just the class name
-                lines = text.split('\n')
-                first_line = lines[0].strip()
-                # Remove common prefixes/suffixes
-                class_name = first_line.replace(" (abstract)", "").replace(".h", "").replace(".cpp/h", "").replace(".cpp", "").strip()
-        
-        if not class_name:
-            print(f"  Warning: Could not extract class name from node: {text[:50]}...")
-            continue
-        
-        # Find header file
-        header_path = find_class_file(class_name)
-        cpp_path = find_cpp_file(class_name)
-        has_cpp = cpp_path is not None
-        
-        if not header_path:
-            print(f"  ⚠️  {class_name}: Header file not found, using fallback description")
-            not_found_count += 1
-            # Use fallback description
-            description = get_fallback_description(class_name)
-            # Try to find methods from any related files
-            all_methods = []
-            key_methods = []
-            # Still update title with description
-            new_text = format_node_text(class_name, key_methods, False, description)
-            node["text"] = new_text
-            updated_count += 1
+    # Nodes are processed concurrently; results are applied and logged in canvas order
+    text_nodes = [node for node in nodes if node.get("type") == "text"]
+    with ThreadPoolExecutor(max_workers=NODE_WORKERS) as pool:
+        updates = list(pool.map(_process_node, text_nodes))
+    
+    for update in updates:
+        for line in update.log:
+            print(line)
+        if update.text is None:
             continue
         
-        # Extract methods - get all public methods first, then filter
-        print(f"  Processing {class_name}...")
-        
-        # Check if it's a struct (structs are in Module.h, MultiSampler.h, etc.)
-        is_struct = class_name in ["TriggerEvent", "Port", "SampleRef", "Voice"]
-        
-        if is_struct:
-            all_methods = extract_struct_members(header_path, class_name)
-        else:
-            all_methods = extract_all_public_methods(header_path)
-        
-        key_methods = get_key_interaction_methods(class_name, all_methods)
-        
-        # Extract class description
-        description = extract_class_description(header_path, class_name)
-        
-        # Format new text
-        new_text = format_node_text(class_name, key_methods, has_cpp, description)
-        node["text"] = new_text
+        if update.node.get("text") != update.text:
+            update.node["text"] = update.text
+            dirty = True
         updated_count += 1
-        
-        if key_methods:
-            print(f"    ✓ Found {len(all_methods)} methods, selected {len(key_methods)} key methods")
-        elif description:
-            print(f"    ✓ Added description: {description[:50]}...")
-        else:
-            print(f"    ⚠️  No methods or description found")
+        if update.not_found:
+            not_found_count += 1
+    
+    if not dirty:
+        print("\nNo changes")
+        return
     
     # Write updated canvas
-    with open(CANVAS_PATH, 'w', encoding='utf-8') as f:
-        json.dump(canvas_data, f, indent="\t", ensure_ascii=False)
+    write_canvas(CANVAS_PATH, canvas_data)
     
     print(f"\n✅ Canvas updated successfully!")
     print(f"   Updated {updated_count} nodes")
@@ -617,4 +678,3 @@ def main():
 
 if __name__ == "__main__":
     main()
-
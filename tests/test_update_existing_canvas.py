@@ -0,0 +1,52 @@
+"""Tests for scripts/update_existing_canvas.py"""
+
+import contextlib
+import io
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+import update_existing_canvas  # noqa: E402
+
+
+class UpdateExistingCanvasTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.canvas = Path(self.tmp.name) / "test.canvas"
+        self._orig_canvas_path = update_existing_canvas._canvas_path
+        update_existing_canvas._canvas_path = lambda: self.canvas
+
+    def tearDown(self):
+        update_existing_canvas._canvas_path = self._orig_canvas_path
+        self.tmp.cleanup()
+
+    def run_main(self) -> str:
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            update_existing_canvas.main()
+        return out.getvalue()
+
+    def test_second_run_leaves_canvas_unchanged(self):
+        self.canvas.write_text(json.dumps({"nodes": [], "edges": []}), encoding="utf-8")
+        self.run_main()
+        first = self.canvas.read_bytes()
+
+        log = self.run_main()
+
+        self.assertIn("No changes", log)
+        self.assertEqual(self.canvas.read_bytes(), first)
+        nodes = json.loads(first)["nodes"]
+        self.assertEqual(len(nodes), len(update_existing_canvas.ALL_CLASSES))
+
+    def test_abstract_nodes_are_recognized(self):
+        nodes = [{"id": "a", "type": "text", "text": "*Module*\n(abstract)"}]
+        existing = update_existing_canvas.get_existing_nodes({"nodes": nodes})
+        self.assertIn("Module", existing)
+
+
+if __name__ == "__main__":
+    unittest.main()